@@ -6,12 +6,28 @@ Other modules import from here to access shared caches and locks.
 """
 import os
 import threading
+from collections import deque
 
 from config_loader import get_all_automations
 
 # Determine async mode based on environment
 DEBUG_MODE = os.environ.get('DEBUG_MODE') == '1'
 
+if not DEBUG_MODE:
+    import eventlet.semaphore
+
+
+def make_lock():
+    """Return a mutex suited to the async mode, for `with lock:` critical sections.
+
+    In production every thread is a greenthread, so a pure-Python eventlet
+    Semaphore(1) is enough - cheaper to acquire/release than a mutex, and it
+    can never block the hub. Debug mode runs real threads and needs a real lock.
+    """
+    if DEBUG_MODE:
+        return threading.Lock()
+    return eventlet.semaphore.Semaphore(1)
+
 # Configuration constants
 # The monitored interface is whichever one owns the default route (see
 # get_primary_interface()); this is only the fallback when there isn't one.
@@ -19,16 +35,162 @@ NETWORK_INTERFACE_FALLBACK = 'wlan0'
 DISK_MOUNT_POINT = '/'       # Disk mount point to monitor
 NETWORK_MONITOR_INTERVAL = 0.1  # Network speed monitoring interval in seconds (100ms)
 NETWORK_INTERFACE_RECHECK_INTERVAL = 5.0  # How often to re-detect the primary interface
+# SocketIO room of clients showing service memory usage; the service status
+# broadcaster only measures memory while it has members
+MEMORY_SUBSCRIBERS_ROOM = 'memory_subscribers'
+
+# Store automation state server-side - dynamically initialized from config.
+# Each automation has its own slot and lock, so polling or updating one
+# automation never waits on another (e.g. a chatty running script).
+# Structure: {automation_name: {'state': {...}, 'lock': make_lock()}}
+# where state is {'job_id': str, 'running': bool, 'output_chunks': deque[str],
+# 'output_size': int, 'output_truncated': int, 'return_code': int}. Output is
+# kept as a bounded deque of chunks (O(1) append) and only joined into one
+# string when a full snapshot is sent to a client - see
+# get_automation_public_state().
+# At most this many output chunks, and this many characters in total, are
+# kept per run; the oldest output is dropped (see append_automation_output()),
+# so a long job can't grow without bound.
+AUTOMATION_OUTPUT_MAX_CHUNKS = 2000
+AUTOMATION_OUTPUT_MAX_CHARS = 1 << 20
 
-# Store automation state server-side - dynamically initialized from config
-# Structure: {automation_name: {'job_id': str, 'running': bool, 'output': str, 'return_code': int, 'process': subprocess.Popen}}
 automation_state = {
-    auto['name']: {'job_id': None, 'running': False, 'output': '', 'return_code': None, 'process': None}
+    auto['name']: {
+        'state': {
+            'job_id': None,
+            'running': False,
+            'output_chunks': deque(maxlen=AUTOMATION_OUTPUT_MAX_CHUNKS),
+            'output_size': 0,
+            'output_truncated': 0,
+            'return_code': None,
+        },
+        'lock': make_lock(),
+    }
     for auto in get_all_automations()
 }
-automation_lock = threading.Lock()
 
-# Cached network speed stats (updated by background thread)
+# The running subprocess.Popen per automation (None when idle), kept out of the
+# state dict so that dict holds only client-facing data. Guarded by the same
+# per-automation lock as the state.
+automation_processes = {name: None for name in automation_state}
+
+
+def get_automation_slot(automation_name):
+    """Return (state, lock) for an automation, or (None, None) if unknown.
+
+    The state dict is only read or modified while holding its lock. It is
+    mutated in place, never replaced, so the pair stays valid for the
+    lifetime of the process.
+    """
+    slot = automation_state.get(automation_name)
+    if slot is None:
+        return None, None
+    return slot['state'], slot['lock']
+
+
+def append_automation_output(state, text):
+    """Append text to an automation's output. Call with its lock held.
+
+    Once AUTOMATION_OUTPUT_MAX_CHUNKS chunks or AUTOMATION_OUTPUT_MAX_CHARS
+    characters are held, the oldest output is dropped (whole chunks, or the
+    start of a single oversized one) and its length added to
+    state['output_truncated'].
+    """
+    chunks = state['output_chunks']
+    if len(chunks) == chunks.maxlen:
+        dropped = len(chunks.popleft())
+        state['output_size'] -= dropped
+        state['output_truncated'] += dropped
+    chunks.append(text)
+    size = state['output_size'] + len(text)
+    while size > AUTOMATION_OUTPUT_MAX_CHARS:
+        if len(chunks) == 1:
+            excess = size - AUTOMATION_OUTPUT_MAX_CHARS
+            chunks[0] = chunks[0][excess:]
+            size -= excess
+            state['output_truncated'] += excess
+            break
+        dropped = len(chunks.popleft())
+        size -= dropped
+        state['output_truncated'] += dropped
+    state['output_size'] = size
+
+
+# State keys that hold the raw output rather than client-facing data
+_OUTPUT_INTERNAL_KEYS = frozenset({'output_chunks', 'output_size'})
+
+
+def automation_state_snapshot(state, output):
+    """Return the client-facing copy of an automation state, carrying `output`.
+
+    Call with the automation's lock held. A shallow copy of the scalar fields
+    (output bookkeeping left out), so it's O(1) however much output has built up.
+    """
+    snapshot = {k: v for k, v in state.items() if k not in _OUTPUT_INTERNAL_KEYS}
+    snapshot['output'] = output
+    return snapshot
+
+
+# Published full snapshot per automation (see get_automation_public_state()),
+# or None when the state has changed since it was last built. The version
+# counts changes, so a snapshot built outside the lock is only published if
+# nothing changed meanwhile.
+_automation_public_state = {name: None for name in automation_state}
+_automation_version = {name: 0 for name in automation_state}
+
+
+def mark_automation_changed(automation_name):
+    """Drop an automation's published snapshot. Call with its lock held, after every mutation."""
+    _automation_public_state[automation_name] = None
+    _automation_version[automation_name] += 1
+
+
+def get_automation_public_state(automation_name):
+    """Return an automation's full client-facing state, or None if unknown.
+
+    The snapshot is built on the first read after a change and then shared:
+    later readers take no lock and copy nothing, so polling clients don't
+    contend with a running script. Building it only holds the lock to copy
+    the scalar fields and the chunk references; the output is joined after
+    the lock is released. A full output that lost its start to the output
+    limits begins with a truncation note. Includes 'incremental': False,
+    ready to emit as an automation_update. The returned dict is shared -
+    never mutate it.
+    """
+    snapshot = _automation_public_state.get(automation_name)
+    if snapshot is not None:
+        return snapshot
+    state, lock = get_automation_slot(automation_name)
+    if state is None:
+        return None
+
+    with lock:
+        snapshot = _automation_public_state[automation_name]
+        if snapshot is not None:
+            return snapshot
+        version = _automation_version[automation_name]
+        chunks = tuple(state['output_chunks'])
+        truncated = state['output_truncated']
+        snapshot = automation_state_snapshot(state, None)
+
+    output = ''.join(chunks)
+    if truncated:
+        output = f"[... {truncated} earlier characters truncated ...]\n" + output
+    snapshot['output'] = output
+    snapshot['incremental'] = False
+
+    with lock:
+        if _automation_version[automation_name] == version:
+            _automation_public_state[automation_name] = snapshot
+    return snapshot
+
+# The stats/status caches below are published, never mutated: their single
+# writer builds a fresh dict and rebinds the module attribute, which is atomic
+# under the GIL, so readers take no lock. Always read them as
+# `app_state.<name>` - a `from app_state import <name>` binding would keep
+# seeing the first snapshot forever.
+
+# Cached network speed stats (published by background thread)
 network_stats_cache = {
     'upload_mbps': 0.0,
     'download_mbps': 0.0,
@@ -37,27 +199,23 @@ network_stats_cache = {
     'network_interface': NETWORK_INTERFACE_FALLBACK,
     'last_update': None
 }
-network_stats_lock = threading.Lock()
 
-# Cached system stats (updated by background thread, pushed via WebSocket)
+# Cached system stats (published by background thread, pushed via WebSocket)
 system_stats_cache = {}
-system_stats_lock = threading.Lock()
 
-# Cached service status (updated by background thread, pushed via WebSocket)
+# Cached service status (published by background thread, pushed via WebSocket)
 service_status_cache = {}
-service_status_lock = threading.Lock()
 
-# Cached internet connectivity (updated by separate background thread)
-internet_status_cache = {'connected': False}
-internet_status_lock = threading.Lock()
-
-# Cached device status (BluOS players, etc.; updated by background thread, pushed via WebSocket)
+# Cached device status (BluOS players, etc.; published by background thread,
+# pushed via WebSocket). Published like the caches above, but it has two
+# writers (the broadcaster and the command route), so device_status_lock
+# serializes their read-modify-write; readers still take no lock.
 device_status_cache = {}
-device_status_lock = threading.Lock()
+device_status_lock = make_lock()
 
 # Track in-progress remote machine power operations (prevents double-clicks)
 remote_machine_operations = {}  # {machine_id: 'starting' | 'stopping'}
-remote_machine_ops_lock = threading.Lock()
+remote_machine_ops_lock = make_lock()
 
 # Server configuration (mutable at runtime via API, persisted to JSON file)
 SERVER_CONFIG_FILE = os.path.join(os.path.dirname(__file__), 'config', 'server_config.local.json')
@@ -69,9 +227,44 @@ SERVER_CONFIG_DEFAULTS = {
     'timeseries_sampling_interval': 60.0,  # seconds
 }
 
-# Server config will be initialized by utils/server_config.py
+# Server config will be initialized by utils/server_config.py. Published the
+# same way as the caches above, as a read-only MappingProxyType that is replaced
+# wholesale on update; the lock only serializes writers (read-modify-write).
 server_config = None
-server_config_lock = threading.Lock()
+server_config_lock = make_lock()
+# Bumped on every publish so loops can tell cheaply whether to re-read it
+server_config_version = 0
+
+# Background loops sleep through wait_interval() rather than time.sleep(), so a
+# config change wakes them at once (cutting an interval from 60s to 2s takes
+# effect now, not when the old 60s runs out) and shutdown stops them promptly.
+# A Condition rather than a shared Event: every sleeping loop must see each
+# wakeup, and one loop clearing an Event could hide it from the others.
+_loop_wakeup = threading.Condition()
+shutdown_event = threading.Event()
+
+
+def wait_interval(seconds):
+    """Sleep up to `seconds`, returning early on a config change or shutdown.
+
+    Returns True if shutdown was requested and the caller should exit.
+    """
+    with _loop_wakeup:
+        if not shutdown_event.is_set():
+            _loop_wakeup.wait(seconds)
+    return shutdown_event.is_set()
+
+
+def wake_background_loops():
+    """Wake every loop sleeping in wait_interval() so it re-reads its interval."""
+    with _loop_wakeup:
+        _loop_wakeup.notify_all()
+
+
+def request_shutdown():
+    """Ask all background loops to exit at their next wakeup (which is now)."""
+    shutdown_event.set()
+    wake_background_loops()
 
 # SocketIO instance (set by main app, used by routes that need to emit)
 _socketio = None
@@ -2,9 +2,9 @@
 import threading
 
 from .network_monitor import network_speed_monitor
-from .system_broadcaster import system_stats_broadcaster
-from .service_broadcaster import service_status_broadcaster, start_remote_machine_poller
-from .internet_monitor import internet_connectivity_monitor
+from .scheduler import PeriodicTask, run_periodic
+from .system_broadcaster import broadcast_system_stats
+from .service_broadcaster import broadcast_service_status, start_remote_machine_poller
 from .device_broadcaster import device_status_broadcaster
 
 _threads = []
@@ -14,11 +14,21 @@ def start_all_background_threads():
     """Start all background monitoring threads."""
     global _threads
 
+    # System stats get a scheduler thread to themselves: a service status
+    # tick blocks (systemctl, the process-tree walk, an internet probe that
+    # can wait seconds while offline), and neither it nor an unreachable
+    # device player may delay the local stats.
+    system_tasks = [
+        PeriodicTask('System Stats Broadcaster', broadcast_system_stats, 'system_stats_interval'),
+    ]
+    service_tasks = [
+        PeriodicTask('Service Status Broadcaster', broadcast_service_status, 'service_status_interval'),
+    ]
+
     thread_configs = [
         ('Network Monitor', network_speed_monitor),
-        ('System Stats Broadcaster', system_stats_broadcaster),
-        ('Service Status Broadcaster', service_status_broadcaster),
-        ('Internet Connectivity Monitor', internet_connectivity_monitor),
+        ('System Stats Scheduler', lambda: run_periodic(system_tasks)),
+        ('Service Status Scheduler', lambda: run_periodic(service_tasks)),
         ('Device Status Broadcaster', device_status_broadcaster),
     ]
 
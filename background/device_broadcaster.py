@@ -5,22 +5,21 @@ Polls every configured device (BluOS players, etc.) by dispatching on its
 WebSocket event. One offline/erroring device is reported as offline without
 killing the loop.
 """
-import time
-
 from config_loader import get_all_devices
+import app_state
 from app_state import (
-    device_status_cache,
     device_status_lock,
-    server_config_lock,
-    get_socketio,
+    wait_interval,
 )
-import app_state
+from utils import ServerConfigValue
 from utils.device_types import get_status_for
+from utils.socket_utils import broadcast
 
 
 def device_status_broadcaster():
     """Background thread that polls devices and broadcasts to all clients."""
     print("Device status broadcaster started")
+    interval = ServerConfigValue('device_status_interval')
 
     while True:
         try:
@@ -35,13 +34,10 @@ def device_status_broadcaster():
                     status[device_id] = {'online': False, 'error': str(e)}
 
             with device_status_lock:
-                device_status_cache.update(status)
-            socketio = get_socketio()
-            if socketio:
-                socketio.emit('device_status', status, namespace='/')
+                app_state.device_status_cache = {**app_state.device_status_cache, **status}
+            broadcast('device_status', status)
         except Exception as e:
             print(f"Error in device status broadcaster: {e}")
-        # Read interval from config each iteration (allows runtime changes)
-        with server_config_lock:
-            interval = app_state.server_config['device_status_interval']
-        time.sleep(interval)
+        # Woken early by a config change (allows runtime changes) or shutdown
+        if wait_interval(interval.get()):
+            break
@@ -1,21 +1,21 @@
 """Network speed monitoring background thread."""
 import time
 
-import psutil
-
+import app_state
 from app_state import (
     NETWORK_INTERFACE_FALLBACK,
     NETWORK_INTERFACE_RECHECK_INTERVAL,
     NETWORK_MONITOR_INTERVAL,
-    network_stats_cache,
-    network_stats_lock,
 )
-from utils.network_utils import get_primary_interface
+from utils.network_utils import get_primary_interface, read_interface_bytes
+
+# Bytes counted over one sampling interval -> megabits per second
+_BYTES_TO_MBPS = 8.0 / (1024.0 * 1024.0) / NETWORK_MONITOR_INTERVAL
 
 
 def network_speed_monitor():
     """Background thread that continuously monitors network speed.
-    Updates the network_stats_cache every NETWORK_MONITOR_INTERVAL seconds.
+    Publishes a fresh network_stats_cache every NETWORK_MONITOR_INTERVAL seconds.
 
     The monitored interface is re-detected periodically so the dashboard follows
     the interface actually carrying traffic (e.g. a USB wifi dongle taking over
@@ -36,29 +36,35 @@ def network_speed_monitor():
                     if interface is not None:
                         print(f"Primary network interface changed: {interface} -> {detected}")
                     interface = detected
-                    with network_stats_lock:
-                        network_stats_cache['network_interface'] = interface
+                    app_state.network_stats_cache = {
+                        **app_state.network_stats_cache,
+                        'network_interface': interface,
+                    }
 
             # Sample the same interface at both ends so a mid-loop switch can't
             # produce a bogus delta.
-            net_io_start = psutil.net_io_counters(pernic=True).get(interface)
+            net_io_start = read_interface_bytes(interface)
             if net_io_start:
                 time.sleep(NETWORK_MONITOR_INTERVAL)
-                net_io_end = psutil.net_io_counters(pernic=True).get(interface)
+                net_io_end = read_interface_bytes(interface)
 
-                # Calculate bytes per interval
-                upload_bytes = net_io_end.bytes_sent - net_io_start.bytes_sent
-                download_bytes = net_io_end.bytes_recv - net_io_start.bytes_recv
+                # Calculate bytes per interval. Clamp at zero: raw procfs
+                # counters go backwards if the link is reset (or wraps on a
+                # 32-bit kernel), which psutil used to smooth over for us.
+                download_bytes = max(net_io_end[0] - net_io_start[0], 0)
+                upload_bytes = max(net_io_end[1] - net_io_start[1], 0)
 
-                # Convert to Mbps (bytes per interval -> bytes per second -> Mbps)
-                upload_mbps = f'{(upload_bytes / NETWORK_MONITOR_INTERVAL) * 8 / (1024**2):0.2f}'
-                download_mbps = f'{(download_bytes / NETWORK_MONITOR_INTERVAL) * 8 / (1024**2):0.2f}'
+                # Convert to Mbps; kept numeric, the frontend does the formatting
+                upload_mbps = round(upload_bytes * _BYTES_TO_MBPS, 2)
+                download_mbps = round(download_bytes * _BYTES_TO_MBPS, 2)
 
-                # Update cache with thread safety
-                with network_stats_lock:
-                    network_stats_cache['upload_mbps'] = upload_mbps
-                    network_stats_cache['download_mbps'] = download_mbps
-                    network_stats_cache['last_update'] = time.time()
+                # Publish a new snapshot (readers take no lock)
+                app_state.network_stats_cache = {
+                    'upload_mbps': upload_mbps,
+                    'download_mbps': download_mbps,
+                    'network_interface': interface,
+                    'last_update': time.time(),
+                }
             else:
                 # Interface not found, sleep and retry
                 time.sleep(NETWORK_MONITOR_INTERVAL)
@@ -0,0 +1,64 @@
+"""Deadline scheduler for the periodic stats broadcasts.
+
+run_periodic() runs its tasks one after another on the calling thread, so
+only give one thread tasks that can't hold each other up; anything that
+blocks (subprocesses, network probes) goes on its own thread.
+"""
+import heapq
+import time
+
+import app_state
+from app_state import wait_interval
+from utils import ServerConfigValue
+
+
+class PeriodicTask:
+    """A function to run every `interval_key` (a server config setting) seconds."""
+
+    def __init__(self, name, func, interval_key):
+        self.name = name
+        self.func = func
+        self.interval = ServerConfigValue(interval_key)
+        self.last_run = None
+
+    def next_due(self):
+        """Monotonic time the task is next due (now, if it has never run)."""
+        if self.last_run is None:
+            return time.monotonic()
+        return self.last_run + self.interval.get()
+
+
+def run_periodic(tasks):
+    """Run each task on its own interval from the calling thread, until shutdown.
+
+    Deadlines are kept in a min-heap, and the thread sleeps (via
+    wait_interval) only until the earliest one - a single thread and a
+    single wakeup per due task, instead of one looping thread per task.
+    Intervals are measured start to start. A config change wakes the sleep,
+    and the heap is then rebuilt from the new intervals so they apply at once.
+    """
+    print(f"Scheduler started: {', '.join(task.name for task in tasks)}")
+    heap = []
+    config_version = None
+
+    while not app_state.shutdown_event.is_set():
+        if app_state.server_config_version != config_version:
+            config_version = app_state.server_config_version
+            heap = [(task.next_due(), i) for i, task in enumerate(tasks)]
+            heapq.heapify(heap)
+
+        due, i = heap[0]
+        now = time.monotonic()
+        if due > now:
+            # Woken early by a config change (allows runtime changes) or shutdown
+            if wait_interval(due - now):
+                break
+            continue
+
+        task = tasks[i]
+        task.last_run = now
+        try:
+            task.func()
+        except Exception as e:
+            print(f"Error in {task.name}: {e}")
+        heapq.heapreplace(heap, (task.next_due(), i))
@@ -1,41 +1,46 @@
-"""Service status broadcasting background thread."""
+"""Service status broadcasting, plus the remote machine poller thread."""
 import time
 import threading
 from concurrent.futures import ThreadPoolExecutor
 
 from config_loader import get_all_services, get_all_remote_machines
-from app_state import (
-    service_status_cache,
-    service_status_lock,
-    internet_status_lock,
-    internet_status_cache,
-    server_config_lock,
-    get_socketio,
-)
 import app_state
+from app_state import MEMORY_SUBSCRIBERS_ROOM
 from utils import (
-    check_service_status,
-    get_service_memory_usage,
+    get_services_state,
+    get_process_tree_memory,
+    get_children_map,
     resolve_host,
     check_machine_online,
     read_plug_wattage,
+    check_internet_connectivity,
+    ServerConfigValue,
 )
+from utils.socket_utils import DeltaBroadcaster, room_has_members
+
+# Both dicts below are written only by the poller thread and read by the
+# broadcaster. Like app_state's caches they are published, never mutated: the
+# poller rebinds the module global to a new dict, so reads need no lock.
 
-# Latest remote machine statuses, written by the poller thread, read by broadcaster
+# Latest remote machine statuses
 _rm_status = {}
-_rm_status_lock = threading.Lock()
 
 # Latest smart-plug wattage readings, keyed by machine id (None = no reading)
 _rm_watts = {}
-_rm_watts_lock = threading.Lock()
 
 # Wattage comes from a Kasa CLI call (a subprocess, seconds per read), so it's
 # polled far less often than the cheap TCP online check.
 _WATTAGE_POLL_INTERVAL = 15
 
+# While the internet stays up, the connectivity check backs off (doubling) to
+# at most this many seconds; a failure drops straight back to the configured
+# internet_check_interval so recovery is noticed quickly.
+_INTERNET_BACKOFF_MAX = 30.0
+
 
 def _poll_wattage(pool, machines):
     """Read plug wattage for every machine that has a plug configured."""
+    global _rm_watts
     futures = {}
     for machine in machines:
         plug_name = machine.get('plug_name')
@@ -53,8 +58,7 @@ def _poll_wattage(pool, machines):
             results[machine_id] = None
 
     if results:
-        with _rm_watts_lock:
-            _rm_watts.update(results)
+        _rm_watts = {**_rm_watts, **results}
 
 
 def _remote_machine_poller():
@@ -63,6 +67,7 @@ def _remote_machine_poller():
     Uses reduced retries (1 instead of 2) since we poll frequently —
     a missed blip will be caught on the next cycle.
     """
+    global _rm_status
     pool = ThreadPoolExecutor(max_workers=4)
     last_wattage_poll = 0.0
     while True:
@@ -86,8 +91,7 @@ def _remote_machine_poller():
                 except Exception:
                     results[machine_id] = False
 
-            with _rm_status_lock:
-                _rm_status.update(results)
+            _rm_status = {**_rm_status, **results}
 
             # Wattage on its own slower cadence so the online check stays snappy
             if time.time() - last_wattage_poll >= _WATTAGE_POLL_INTERVAL:
@@ -105,47 +109,109 @@ def start_remote_machine_poller():
     t.start()
 
 
-def service_status_broadcaster():
-    """Background thread that checks service status and broadcasts to all clients."""
-    print("Service status broadcaster started")
+class _InternetCheck:
+    """Internet connectivity check on an adaptive cadence.
 
-    while True:
+    poll() is called every service tick but only probes when the current delay
+    has elapsed, so it runs at tick granularity.
+    """
+
+    def __init__(self):
+        self.interval = ServerConfigValue('internet_check_interval')
+        self.connected = None  # Unknown until the first probe
+        self._base = None
+        self._delay = None
+        self._next_check = 0.0
+
+    def poll(self):
+        """Return the latest connectivity, probing first if a check is due."""
+        now = time.monotonic()
+        if now < self._next_check:
+            return self.connected
+        base = self.interval.get()
         try:
-            status = {}
-            for service in get_all_services():
-                is_running = check_service_status(service['service_name'])
-                memory_bytes = get_service_memory_usage(service['service_name']) if is_running else None
-                status[service['id']] = {
-                    'running': is_running,
-                    'memory_bytes': memory_bytes
-                }
-
-            # Read latest remote machine statuses (non-blocking)
-            with _rm_status_lock:
-                rm_snapshot = dict(_rm_status)
-            with _rm_watts_lock:
-                watts_snapshot = dict(_rm_watts)
-            for machine in get_all_remote_machines():
-                mid = machine['id']
-                status[f"rm_{mid}"] = {
-                    'running': rm_snapshot.get(mid, False),
-                    'memory_bytes': None,
-                    'type': 'remote_machine',
-                    'watts': watts_snapshot.get(mid),
-                }
-
-            # Add internet status from its own cache
-            with internet_status_lock:
-                status['internet'] = internet_status_cache['connected']
-
-            with service_status_lock:
-                service_status_cache.update(status)
-            socketio = get_socketio()
-            if socketio:
-                socketio.emit('service_status', status, namespace='/')
+            connected = check_internet_connectivity()
         except Exception as e:
-            print(f"Error in service status broadcaster: {e}")
-        # Read interval from config each iteration (allows runtime changes)
-        with server_config_lock:
-            interval = app_state.server_config['service_status_interval']
-        time.sleep(interval)
+            print(f"Error checking internet connectivity: {e}")
+            connected = None
+        if connected and self.connected and base == self._base:
+            self._delay = min(self._delay * 2, max(_INTERNET_BACKOFF_MAX, base))
+        else:
+            # Down, just came up, or the configured interval changed
+            self._delay = base
+        self._base = base
+        if connected is not None:
+            if connected != self.connected:
+                print(f"Internet connectivity {'up' if connected else 'down'}")
+            self.connected = connected
+        self._next_check = now + self._delay
+        return self.connected
+
+
+# Services and their unit names, fixed for the process lifetime (config is
+# loaded once at startup), so a tick doesn't rebuild them
+_SERVICES = tuple(get_all_services())
+_SERVICE_UNITS = [service['service_name'] for service in _SERVICES]
+
+# Internet connectivity is checked with the service status, on its own
+# adaptive cadence, so the flag always goes out with the status it belongs to
+_internet = _InternetCheck()
+
+_status_broadcast = DeltaBroadcaster('service_status')
+
+
+def broadcast_service_status():
+    """Check service, remote machine and internet status and broadcast it to all clients.
+
+    One tick of its own scheduler thread (see background/scheduler.py), run every
+    service_status_interval seconds.
+    """
+    # Entries that haven't changed since the last tick are reused rather than
+    # reallocated. The previous snapshot is published (read without a lock),
+    # so entries are shared between snapshots but never mutated.
+    previous = app_state.service_status_cache
+    status = {}
+    # One systemctl call for every service's state and MainPID
+    states = get_services_state(_SERVICE_UNITS)
+    # Walking the process trees is most of a tick's cost, so it's skipped
+    # (memory_bytes None) while no connected client is showing memory
+    want_memory = room_has_members(MEMORY_SUBSCRIBERS_ROOM)
+    # One process-table scan shared by every service's memory lookup
+    children_map = get_children_map() if want_memory and any(
+        s['active'] and s['main_pid'] for s in states.values()) else None
+    for service in _SERVICES:
+        state = states[service['service_name']]
+        is_running = state['active']
+        memory_bytes = (get_process_tree_memory(state['main_pid'], children_map)
+                        if is_running and want_memory else None)
+        entry = previous.get(service['id'])
+        if (entry is None or entry['running'] != is_running
+                or entry['memory_bytes'] != memory_bytes):
+            entry = {
+                'running': is_running,
+                'memory_bytes': memory_bytes
+            }
+        status[service['id']] = entry
+
+    # Latest remote machine statuses (published snapshots, no lock or copy)
+    rm_snapshot = _rm_status
+    watts_snapshot = _rm_watts
+    for machine in get_all_remote_machines():
+        mid = machine['id']
+        key = f"rm_{mid}"
+        running = rm_snapshot.get(mid, False)
+        watts = watts_snapshot.get(mid)
+        entry = previous.get(key)
+        if entry is None or entry['running'] != running or entry['watts'] != watts:
+            entry = {
+                'running': running,
+                'memory_bytes': None,
+                'type': 'remote_machine',
+                'watts': watts,
+            }
+        status[key] = entry
+
+    status['internet'] = bool(_internet.poll())
+
+    app_state.service_status_cache = status
+    _status_broadcast.send(status)
@@ -1,31 +1,17 @@
-"""System stats broadcasting background thread."""
-import time
-
-from app_state import (
-    system_stats_cache,
-    system_stats_lock,
-    server_config_lock,
-    get_socketio,
-)
+"""System stats broadcasting."""
 import app_state
 from utils import get_system_stats
+from utils.socket_utils import DeltaBroadcaster
+
+_stats_broadcast = DeltaBroadcaster('system_stats')
 
 
-def system_stats_broadcaster():
-    """Background thread that collects system stats and broadcasts to all clients."""
-    print("System stats broadcaster started")
+def broadcast_system_stats():
+    """Collect system stats, publish them and broadcast what changed to all clients.
 
-    while True:
-        try:
-            stats = get_system_stats()
-            with system_stats_lock:
-                system_stats_cache.update(stats)
-            socketio = get_socketio()
-            if socketio:
-                socketio.emit('system_stats', stats, namespace='/')
-        except Exception as e:
-            print(f"Error in system stats broadcaster: {e}")
-        # Read interval from config each iteration (allows runtime changes)
-        with server_config_lock:
-            interval = app_state.server_config['system_stats_interval']
-        time.sleep(interval)
+    One tick of its own scheduler thread (see background/scheduler.py), run every
+    system_stats_interval seconds.
+    """
+    stats = get_system_stats()
+    app_state.system_stats_cache = stats
+    _stats_broadcast.send(stats)
@@ -22,23 +22,39 @@ Local files can:
 
 import json
 import os
-from typing import List, Dict, Any
+from functools import lru_cache
+from types import MappingProxyType
+from typing import List, Dict, Any, Mapping
 
 CONFIG_DIR = os.path.join(os.path.dirname(__file__), 'config')
 
+_EMPTY_CONFIG = MappingProxyType({})
 
-def load_json_config(filename: str) -> Dict[str, Any]:
-    """Load a JSON configuration file."""
+
+def load_json_config(filename: str) -> Mapping[str, Any]:
+    """Load a JSON configuration file (read-only, cached until it changes).
+
+    Parsed files are memoized on (path, mtime_ns), so reloading an unchanged
+    file costs one stat(). The result is shared between callers: neither it
+    nor the items inside it may be mutated.
+    """
     filepath = os.path.join(CONFIG_DIR, filename)
-    if not os.path.exists(filepath):
-        return {}
+    try:
+        mtime_ns = os.stat(filepath).st_mtime_ns
+    except OSError:
+        return _EMPTY_CONFIG
+    return _parse_json_config(filepath, mtime_ns)
+
 
+@lru_cache(maxsize=32)
+def _parse_json_config(filepath: str, mtime_ns: int) -> Mapping[str, Any]:
+    """Parse one version (by mtime) of a JSON configuration file."""
     try:
         with open(filepath, 'r') as f:
-            return json.load(f)
+            return MappingProxyType(json.load(f))
     except (json.JSONDecodeError, IOError) as e:
         print(f"Warning: Failed to load {filepath}: {e}")
-        return {}
+        return _EMPTY_CONFIG
 
 
 def merge_configs(base_items: List[Dict], local_items: List[Dict], key_field: str) -> List[Dict]:
@@ -51,10 +67,12 @@ def merge_configs(base_items: List[Dict], local_items: List[Dict], key_field: st
         key_field: Field name to use as unique identifier ('name' or 'id')
 
     Returns:
-        Merged list with local overrides applied
+        Merged list with local overrides applied. Items nobody overrides are
+        the (cached, shared) input dicts themselves; only overridden items
+        are copied.
     """
     # Create a dict from base items for easy lookup
-    merged = {item[key_field]: item.copy() for item in base_items}
+    merged = {item[key_field]: item for item in base_items}
 
     # Apply local overrides
     for local_item in local_items:
@@ -64,11 +82,11 @@ def merge_configs(base_items: List[Dict], local_items: List[Dict], key_field: st
         item_key = local_item[key_field]
 
         if item_key in merged:
-            # Override existing item properties
-            merged[item_key].update(local_item)
+            # Override existing item properties (on a copy of the base item)
+            merged[item_key] = {**merged[item_key], **local_item}
         else:
             # Add new item from local config
-            merged[item_key] = local_item.copy()
+            merged[item_key] = local_item
 
     # Filter out disabled items and return as list
     return [item for item in merged.values() if item.get('enabled', True)]
@@ -166,11 +184,11 @@ REMOTE_MACHINES = load_remote_machine_config()
 DEVICES = load_device_config()
 COMMAND_TIMESERIES_CONFIGS = load_command_timeseries_config()
 
-# Create lookup dictionaries
-AUTOMATION_MAP = {auto['name']: auto for auto in AUTOMATIONS}
-SERVICE_MAP = {service['id']: service for service in SERVICES}
-REMOTE_MACHINE_MAP = {rm['id']: rm for rm in REMOTE_MACHINES}
-DEVICE_MAP = {device['id']: device for device in DEVICES}
+# Create lookup dictionaries (read-only: built once at import, shared by every request)
+AUTOMATION_MAP = MappingProxyType({auto['name']: auto for auto in AUTOMATIONS})
+SERVICE_MAP = MappingProxyType({service['id']: service for service in SERVICES})
+REMOTE_MACHINE_MAP = MappingProxyType({rm['id']: rm for rm in REMOTE_MACHINES})
+DEVICE_MAP = MappingProxyType({device['id']: device for device in DEVICES})
 
 
 def get_automation_config(automation_name: str) -> Dict[str, Any]:
@@ -1,70 +1,137 @@
 """Automation API routes."""
+import codecs
+import io
 import os
-import shlex
 import subprocess
 import threading
 import time
 import uuid
-from datetime import datetime
+from collections import deque
 
 from flask import Blueprint, jsonify, request
 
 from config_loader import get_all_automations, get_automation_config
 from app_state import (
-    automation_state,
-    automation_lock,
+    get_automation_slot,
+    automation_processes,
+    append_automation_output,
+    AUTOMATION_OUTPUT_MAX_CHUNKS,
+    get_automation_public_state,
+    mark_automation_changed,
     DEBUG_MODE,
-    get_socketio,
 )
 from process_mgmt import kill_proc_tree
+from utils.http_utils import StaticJSONResponse, json_response
+from utils.socket_utils import broadcast
 
 # Import eventlet only if not in debug mode
 if not DEBUG_MODE:
     import eventlet
+    # Popen whose pipes are green: a read waits on the eventlet hub for the fd
+    # to become readable instead of blocking every greenthread. monkey_patch()
+    # swaps this in too, but run_script must never depend on import order.
+    from eventlet.green import subprocess as green_subprocess
+    from eventlet.hubs import trampoline
 
 automations_bp = Blueprint('automations', __name__)
 
+# Incremental output is broadcast in batches rather than once per read: at
+# most one automation_update per _OUTPUT_FLUSH_INTERVAL seconds (10 Hz),
+# carrying everything read since the last one, however fast the script prints.
+_OUTPUT_FLUSH_INTERVAL = 0.1
 
-def broadcast_automation_state(automation_name, incremental_output=None):
-    """Broadcast automation state to all connected clients.
-    Note: This should be called WITHOUT holding automation_lock.
+# Script stdout is read in chunks of up to this many bytes (whatever the pipe
+# has ready), not line by line
+_OUTPUT_READ_SIZE = 65536
 
-    Args:
-        automation_name: Name of the automation
-        incremental_output: If provided, only send this new output (not full output)
+
+def _output_reader(process):
+    """Return a function that reads the next chunk of process's stdout (b'' at EOF).
+
+    Reads the pipe fd with os.read() directly - no buffered-reader layer or
+    extra copy. In production the fd is non-blocking and each read first
+    waits on the eventlet hub for the pipe to become readable, so a quiet
+    script never blocks other greenthreads.
+    """
+    fd = process.stdout.fileno()
+    if DEBUG_MODE:
+        return lambda: os.read(fd, _OUTPUT_READ_SIZE)
+
+    os.set_blocking(fd, False)
+
+    def read():
+        while True:
+            try:
+                return os.read(fd, _OUTPUT_READ_SIZE)
+            except BlockingIOError:
+                trampoline(fd, read=True)
+    return read
+
+_automations_response = StaticJSONResponse(lambda: {'automations': get_all_automations()})
+
+
+def _wait_for_exit(process):
+    """Wait for process to exit and return its return code.
+
+    In production, eventlet's green Popen.wait() polls every 10ms. Where the
+    kernel supports pidfds (Linux 5.3+), wait on the hub for the pidfd to
+    become readable instead - it does the moment the process exits - so the
+    wait costs nothing while a long script runs; then reap it.
     """
-    with automation_lock:
-        state = automation_state[automation_name].copy()
-        # Don't send the process object to clients
-        state.pop('process', None)
-
-        # If incremental output is provided, replace full output with just the increment
-        # But don't broadcast incremental updates if the automation was cancelled
-        if incremental_output is not None:
-            if not state['running']:
-                # Automation was cancelled, don't broadcast incremental output
-                return
-            state['output'] = incremental_output
-            state['incremental'] = True
+    if not DEBUG_MODE and hasattr(os, 'pidfd_open'):
+        try:
+            pidfd = os.pidfd_open(process.pid)
+        except OSError:
+            pass  # Old kernel, or already reaped: plain wait() below
         else:
-            state['incremental'] = False
+            try:
+                trampoline(pidfd, read=True)
+            finally:
+                os.close(pidfd)
+    return process.wait()
 
-    # Emit outside the lock to avoid blocking
+
+def broadcast_automation_state(automation_name):
+    """Broadcast an automation's full state to all connected clients.
+    Note: This should be called WITHOUT holding the automation's lock.
+    """
     try:
-        socketio = get_socketio()
-        if socketio:
-            socketio.emit('automation_update', {
-                'automation': automation_name,
-                'state': state
-            }, namespace='/')
+        broadcast('automation_update', {
+            'automation': automation_name,
+            'state': get_automation_public_state(automation_name)
+        })
     except Exception as e:
         print(f"Error broadcasting state for {automation_name}: {e}")
 
 
+def broadcast_automation_output(automation_name, job_id, text):
+    """Broadcast newly read output of run job_id of an automation to all clients.
+
+    Sends just the text to append (automation_output), not the state: the
+    clients already have the rest from the last automation_update.
+    Note: This should be called WITHOUT holding the automation's lock.
+    """
+    state, lock = get_automation_slot(automation_name)
+    with lock:
+        # Don't send output after a cancel, or once another run has started
+        if not (state['running'] and state['job_id'] == job_id):
+            return
+
+    # Emit outside the lock to avoid blocking
+    try:
+        broadcast('automation_output', {
+            'automation': automation_name,
+            'job_id': job_id,
+            'append': text
+        })
+    except Exception as e:
+        print(f"Error broadcasting output for {automation_name}: {e}")
+
+
 @automations_bp.route('/api/automations')
 def get_automations():
     """Get all automation configurations."""
-    return jsonify({'automations': get_all_automations()})
+    return _automations_response.response()
 
 
 @automations_bp.route('/api/automation/<automation_name>', methods=['POST'])
@@ -83,106 +150,176 @@ def run_automation(automation_name):
     data = request.get_json() or {}
     args = data.get('args', '').strip()
 
-    script_path = automation_config['script_path']
+    # Build the command up front, so bad arguments get a synchronous 400
+    # instead of a started-then-failed run
+    cmd = ['/bin/bash', automation_config['script_path']]
+    if args:
+        # Use shlex to safely split arguments (imported here: most runs have no args)
+        import shlex
+        try:
+            cmd += shlex.split(args)
+        except ValueError as e:
+            print(f"Invalid arguments for {automation_name}: {e}")
+            return jsonify({
+                'success': False,
+                'error': f'Invalid arguments: {str(e)}'
+            }), 400
+
     job_id = str(uuid.uuid4())
 
+    state, lock = get_automation_slot(automation_name)
+
     # Atomically check if running AND set running=True to prevent race conditions
-    with automation_lock:
-        if automation_state[automation_name]['running']:
+    with lock:
+        if state['running']:
             print(f"Automation {automation_name} is already running")
             return jsonify({
                 'success': False,
                 'error': 'Automation already running'
             }), 400
 
-        # Set running=True immediately while holding the lock
-        automation_state[automation_name] = {
+        # Set running=True immediately while holding the lock. Reset in place:
+        # the state dict is shared with every holder of this automation's slot.
+        state.clear()
+        state.update({
             'job_id': job_id,
             'running': True,
-            'output': 'Starting...\n',
+            'output_chunks': deque(maxlen=AUTOMATION_OUTPUT_MAX_CHUNKS),
+            'output_size': 0,
+            'output_truncated': 0,
             'return_code': None,
-            'process': None
-        }
+        })
+        append_automation_output(state, 'Starting...\n')
+        mark_automation_changed(automation_name)
 
     print(f"Starting automation {automation_name} with job_id {job_id}" + (f" and args: {args}" if args else ""))
 
     # Broadcast initial state (outside lock)
     broadcast_automation_state(automation_name)
 
+    def is_current():
+        # Whether this run still owns the slot: not cancelled, and no newer
+        # run has been started since (a cancel frees the slot at once, so a
+        # restart can begin before this run's reader and flusher wind down).
+        # Call with the lock held, or for a racy early-exit check.
+        return state['running'] and state['job_id'] == job_id
+
     def run_script():
         try:
-            # Build command with arguments if provided
-            if args:
-                # Use shlex to safely split arguments
-                try:
-                    arg_list = shlex.split(args)
-                    cmd = ['/bin/bash', script_path] + arg_list
-                except ValueError as e:
-                    # If argument parsing fails, add error to output
-                    with automation_lock:
-                        automation_state[automation_name]['output'] += f"ERROR: Invalid arguments: {str(e)}\n"
-                        automation_state[automation_name]['running'] = False
-                        automation_state[automation_name]['return_code'] = -1
-                        automation_state[automation_name]['completed_at'] = datetime.now().strftime('%H:%M:%S %m/%d/%y')
-                    broadcast_automation_state(automation_name)
-                    return
-            else:
-                cmd = ['/bin/bash', script_path]
-
             # Build environment with optional custom env vars from config
             proc_env = os.environ.copy()
             if 'env' in automation_config and isinstance(automation_config['env'], dict):
                 proc_env.update(automation_config['env'])
 
-            process = subprocess.Popen(
+            popen = subprocess.Popen if DEBUG_MODE else green_subprocess.Popen
+            process = popen(
                 cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                universal_newlines=True,
-                env=proc_env
+                bufsize=0,  # Read straight from the fd (see _output_reader)
+                env=proc_env,
+                # With inherited fds left alone (everything Python opens is
+                # non-inheritable anyway), an absolute executable and no
+                # preexec_fn/cwd/pass_fds, CPython starts the script with
+                # posix_spawn (vfork) instead of copying our page tables in a
+                # fork - keep it that way when adding options here
+                close_fds=False,
             )
-
-            with automation_lock:
-                automation_state[automation_name]['process'] = process
-
-            # Read output line by line and broadcast updates
-            for line in process.stdout:
-                with automation_lock:
-                    # Check if cancelled - if so, stop processing output
-                    if not automation_state[automation_name]['running']:
+            read_output = _output_reader(process)
+            # Decodes chunks that may split a UTF-8 sequence or a \r\n pair,
+            # translating newlines the way text mode did
+            decoder = io.IncrementalNewlineDecoder(
+                codecs.getincrementaldecoder('utf-8')(errors='replace'), translate=True)
+
+            with lock:
+                if is_current():
+                    automation_processes[automation_name] = process
+
+            # Output read but not yet stored/broadcast. A deque, so the reader
+            # appends and the flusher pops without sharing a lock.
+            pending = deque()
+            reading_done = threading.Event()
+
+            def flush_output():
+                # Takes the automation lock once per batch to store it, and is
+                # the only sender of incremental updates, so batches can't be
+                # reordered. Exits after the batch that follows reading_done.
+                while True:
+                    done = reading_done.wait(_OUTPUT_FLUSH_INTERVAL)
+                    chunks = []
+                    while pending:
+                        chunks.append(pending.popleft())
+                    if chunks:
+                        batch = ''.join(chunks)
+                        with lock:
+                            # Output read after a cancel (or a restart) is dropped
+                            current = is_current()
+                            if current:
+                                append_automation_output(state, batch)
+                                mark_automation_changed(automation_name)
+                        if current:
+                            broadcast_automation_output(automation_name, job_id, batch)
+                    if done:
+                        return
+
+            flusher = threading.Thread(target=flush_output, daemon=True)
+            flusher.start()
+
+            # Read output a chunk at a time; the flusher stores and broadcasts
+            # it in batches
+            try:
+                while True:
+                    data = read_output()
+                    text = decoder.decode(data, final=not data)
+                    # Check if cancelled - if so, stop processing output. No lock
+                    # needed for an early exit; the flusher re-checks under it.
+                    if not is_current():
                         break
-                    automation_state[automation_name]['output'] += line
-                # Broadcast incremental update outside the lock
-                broadcast_automation_state(automation_name, incremental_output=line)
-
-            process.wait()
-
-            # Only update final state if not already cancelled
-            with automation_lock:
-                if automation_state[automation_name]['running']:
+                    if text:
+                        pending.append(text)
+                    if not data:
+                        break  # EOF
+            finally:
+                # Send the tail now (not on the next tick), and before the
+                # completion broadcast below
+                reading_done.set()
+                flusher.join()
+
+            _wait_for_exit(process)
+
+            # Only update final state if not already cancelled (or replaced
+            # by a newer run)
+            with lock:
+                if is_current():
                     # Normal completion - wasn't cancelled
-                    automation_state[automation_name]['running'] = False
-                    automation_state[automation_name]['return_code'] = process.returncode
-                    automation_state[automation_name]['process'] = None
-                    automation_state[automation_name]['completed_at'] = datetime.now().strftime('%H:%M:%S %m/%d/%y')
+                    state['running'] = False
+                    state['return_code'] = process.returncode
+                    automation_processes[automation_name] = None
+                    state['completed_at'] = time.strftime('%H:%M:%S %m/%d/%y')
+                    mark_automation_changed(automation_name)
                     should_broadcast = True
                 else:
-                    # Was cancelled - don't overwrite the cancellation state
+                    # Was cancelled - don't overwrite the cancellation state,
+                    # or a newer run's state
                     should_broadcast = False
 
             if should_broadcast:
                 broadcast_automation_state(automation_name)
 
         except Exception as e:
-            with automation_lock:
-                automation_state[automation_name]['output'] += f"\n\nERROR: {str(e)}\n"
-                automation_state[automation_name]['running'] = False
-                automation_state[automation_name]['return_code'] = -1
-                automation_state[automation_name]['process'] = None
-                automation_state[automation_name]['completed_at'] = datetime.now().strftime('%H:%M:%S %m/%d/%y')
-            broadcast_automation_state(automation_name)
+            with lock:
+                current = is_current()
+                if current:
+                    append_automation_output(state, f"\n\nERROR: {str(e)}\n")
+                    state['running'] = False
+                    state['return_code'] = -1
+                    automation_processes[automation_name] = None
+                    state['completed_at'] = time.strftime('%H:%M:%S %m/%d/%y')
+                    mark_automation_changed(automation_name)
+            if current:
+                broadcast_automation_state(automation_name)
+            else:
+                print(f"Error in cancelled run {job_id} of {automation_name}: {e}")
 
     # Start the script in a background thread/greenthread
     if DEBUG_MODE:
@@ -193,7 +330,7 @@ def run_automation(automation_name):
         # Use eventlet greenthreads in production
         eventlet.spawn(run_script)
 
-    response = jsonify({
+    response = json_response({
         'success': True,
         'job_id': job_id,
         'message': f'{automation_name} started'
@@ -205,35 +342,30 @@ def run_automation(automation_name):
 @automations_bp.route('/api/automation/<automation_name>/status')
 def get_automation_status(automation_name):
     """Get the current status and output of an automation."""
-    if automation_name not in automation_state:
+    state = get_automation_public_state(automation_name)
+    if state is None:
         return jsonify({
             'success': False,
             'error': 'Invalid automation'
         }), 404
 
-    with automation_lock:
-        state = automation_state[automation_name].copy()
-        # Don't send the process object
-        state.pop('process', None)
-
-        return jsonify({
-            'success': True,
-            **state
-        })
+    return json_response({
+        'success': True,
+        **state
+    })
 
 
 @automations_bp.route('/api/automation/<automation_name>/cancel', methods=['POST'])
 def cancel_automation(automation_name):
     """Cancel a running automation."""
-    if automation_name not in automation_state:
+    state, lock = get_automation_slot(automation_name)
+    if state is None:
         return jsonify({
             'success': False,
             'error': 'Invalid automation'
         }), 404
 
-    with automation_lock:
-        state = automation_state[automation_name]
-
+    with lock:
         if not state['running']:
             # Return success - automation is already not running, which is the desired state
             # This handles race conditions where the automation finishes before cancel is processed
@@ -242,8 +374,9 @@ def cancel_automation(automation_name):
                 'message': 'Automation already completed'
             })
 
-        # Get the process reference
-        process: subprocess.Popen = state.get('process')
+        # Get the process reference, and the run it belongs to
+        job_id = state['job_id']
+        process: subprocess.Popen = automation_processes[automation_name]
         if not process:
             return jsonify({
                 'success': False,
@@ -254,13 +387,16 @@ def cancel_automation(automation_name):
     try:
         kill_proc_tree(process.pid)
 
-        # Update state
-        with automation_lock:
-            state['output'] += "\n\n=== CANCELLED BY USER ===\n"
-            state['running'] = False
-            state['return_code'] = -999  # Special code for cancelled
-            state['process'] = None
-            state['completed_at'] = datetime.now().strftime('%H:%M:%S %m/%d/%y')
+        # Update state, unless the run finished (and another started)
+        # while the lock was released
+        with lock:
+            if state['running'] and state['job_id'] == job_id:
+                append_automation_output(state, "\n\n=== CANCELLED BY USER ===\n")
+                state['running'] = False
+                state['return_code'] = -999  # Special code for cancelled
+                automation_processes[automation_name] = None
+                state['completed_at'] = time.strftime('%H:%M:%S %m/%d/%y')
+                mark_automation_changed(automation_name)
 
         # Broadcast outside the lock
         broadcast_automation_state(automation_name)
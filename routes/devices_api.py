@@ -8,7 +8,8 @@ a command endpoint, and an artwork proxy.
 from flask import Blueprint, jsonify, request, Response
 
 from config_loader import get_all_devices, get_device_config
-from app_state import device_status_cache, device_status_lock
+import app_state
+from app_state import device_status_lock
 from utils.device_types import run_command, get_status_for
 from utils import bluos_utils
 
@@ -42,8 +43,7 @@ def get_devices():
 @devices_bp.route('/api/devices/status')
 def get_devices_status():
     """Snapshot of the latest device statuses (for initial load / tab focus)."""
-    with device_status_lock:
-        return jsonify(dict(device_status_cache))
+    return jsonify(app_state.device_status_cache)
 
 
 @devices_bp.route('/api/device/<device_id>/command', methods=['POST'])
@@ -78,7 +78,7 @@ def device_command(device_id):
         status = get_status_for(device)
         status['online'] = True
         with device_status_lock:
-            device_status_cache[device_id] = status
+            app_state.device_status_cache = {**app_state.device_status_cache, device_id: status}
     except Exception:
         pass
 
@@ -96,8 +96,7 @@ def device_art(device_id):
     if not get_device_config(device_id):
         return jsonify({'error': 'Unknown device'}), 404
 
-    with device_status_lock:
-        cached = device_status_cache.get(device_id, {})
+    cached = app_state.device_status_cache.get(device_id, {})
     image_url = cached.get('image')
     if not image_url:
         return jsonify({'error': 'No artwork available'}), 404
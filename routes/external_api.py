@@ -1,18 +1,215 @@
 """External API routes (stocks, weather)."""
-import json
 import time
-import urllib.error
 import urllib.parse
-import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 
-from flask import Blueprint, jsonify, request
+import urllib3
+from flask import Blueprint, Response, jsonify, request
 
-from utils import lttb_downsample
+from utils import json_utils, lttb_downsample
+from utils.cache_utils import TTLCache
+from utils.http_utils import json_response
 
 external_bp = Blueprint('external', __name__)
 
 
+# Upper bound on concurrent Yahoo fetches per request (they're network-bound)
+_MAX_STOCK_FETCH_WORKERS = 16
+
+# One keep-alive connection pool for all outbound API calls, so repeat requests
+# to Yahoo/wttr.in skip the TCP + TLS handshake (hundreds of ms on a Pi).
+# Sockets are green under eventlet, like urllib's were. Only connection
+# setup is retried: a DNS blip or refused/timed-out connect on the Pi's wifi
+# usually succeeds a moment later, whereas retrying a read timeout would
+# stretch one hung fetch (and the stock stream waiting on it) past 15s.
+_http = urllib3.PoolManager(
+    maxsize=_MAX_STOCK_FETCH_WORKERS,
+    retries=urllib3.Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.2),
+    timeout=urllib3.Timeout(connect=3, read=15),
+)
+
+
+def _get_json(url, headers, **kwargs):
+    """GET a URL through the shared pool and decode its JSON body.
+
+    Raises on HTTP error statuses, like urlopen() did.
+    """
+    response = _http.request('GET', url, headers=headers, **kwargs)
+    if response.status >= 400:
+        raise RuntimeError(f"HTTP Error {response.status}: {response.reason}")
+    return json_utils.loads(response.data)
+
+
+# Bar interval by requested range, for the best resolution Yahoo allows:
+# (max requested days, extra days fetched before the cutoff, interval). The
+# first row whose max covers the request wins; 0 days means all history.
+_STOCK_INTERVALS = (
+    (7, 1, '5m'),          # 1 week or less - 5 minute bars for high resolution
+    (60, 1, '1h'),         # Up to 2 months - hourly
+    (365 * 2, 30, '1d'),   # Up to 2 years - daily
+    (float('inf'), 30, '1wk'),  # Longer - weekly
+)
+_ALL_HISTORY_DAYS = 365 * 50  # Fetch window for days == 0 (weekly bars)
+
+# Compact axis-tick label format per interval
+_DATE_FORMATS = {
+    '5m': '%m/%d',  # Just month/day for intraday
+    '15m': '%m/%d',
+    '30m': '%m/%d',
+    '1h': '%m/%d',
+    '1d': '%b %d',  # "Jan 15" for daily
+    '1wk': '%b %y',  # "Jan 25" for weekly/longer
+}
+
+# Parsed Yahoo chart responses, keyed by (symbol, interval, requested_days).
+# How long one stays fresh depends on the bar interval: a new 5m bar appears
+# every few minutes, while weekly history barely moves in hours.
+_yahoo_cache = TTLCache(maxsize=512)
+_YAHOO_CACHE_TTL = {
+    '5m': 60,
+    '1h': 5 * 60,
+    '1d': 60 * 60,
+    '1wk': 6 * 60 * 60,
+}
+
+
+def _format_date_labels(times, date_format):
+    """Format timestamps as local-date labels, running strftime once per day.
+
+    Every label format used here is date-only, so all points on the same local
+    calendar day share a label. Timestamps arrive sorted, so a day's label is
+    reused until one crosses the next local midnight (a 5m chart has ~80
+    points per day).
+    """
+    labels = []
+    label = None
+    day_start = day_end = None
+    for t in times:
+        if day_start is None or not day_start <= t < day_end:
+            moment = datetime.fromtimestamp(t)
+            label = moment.strftime(date_format)
+            midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+            day_start = midnight.timestamp()
+            # Naive local datetimes, so a DST day is still 23/25 hours long
+            day_end = (midnight + timedelta(days=1)).timestamp()
+        labels.append(label)
+    return labels
+
+
+def _fetch_symbol(symbol, requested_days, max_points):
+    """Fetch and shape the cumulative-return series for one symbol.
+
+    Returns (symbol, data). Errors are reported in data['error'] rather than
+    raised, so one bad symbol doesn't fail the others.
+    """
+    try:
+        # Use Yahoo Finance API to get stock data
+        # Choose interval based on date range for best resolution
+        end_date = datetime.now()
+
+        if requested_days == 0:
+            # All time - use weekly interval
+            start_date = end_date - timedelta(days=_ALL_HISTORY_DAYS)
+            interval = '1wk'
+        else:
+            extra_days, interval = next(
+                (extra, iv) for max_days, extra, iv in _STOCK_INTERVALS
+                if requested_days <= max_days
+            )
+            start_date = end_date - timedelta(days=requested_days + extra_days)
+
+        cache_key = (symbol, interval, requested_days)
+        result = _yahoo_cache.get(cache_key)
+        if result is None:
+            period1 = int(start_date.timestamp())
+            period2 = int(end_date.timestamp())
+
+            url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}?period1={period1}&period2={period2}&interval={interval}"
+
+            result = _get_json(url, headers={'User-Agent': 'Mozilla/5.0'})
+            _yahoo_cache.set(cache_key, result, _YAHOO_CACHE_TTL[interval])
+
+        if 'chart' in result and 'result' in result['chart'] and result['chart']['result']:
+            chart_data = result['chart']['result'][0]
+            timestamps = chart_data.get('timestamp', [])
+            quotes = chart_data['indicators']['quote'][0]
+            close_prices = quotes.get('close', [])
+
+            if not timestamps or not close_prices:
+                return symbol, {
+                    'dates': [],
+                    'cumulative_return': [],
+                    'error': 'No data available'
+                }
+
+            # Filter to requested time range (and drop null closes) in one
+            # pass, into parallel time/price lists
+            if requested_days > 0:
+                cutoff_time = end_date.timestamp() - (requested_days * 24 * 60 * 60)
+            else:
+                cutoff_time = float('-inf')
+            times = []
+            prices = []
+            for t, p in zip(timestamps, close_prices):
+                if p is not None and t >= cutoff_time:
+                    times.append(t)
+                    prices.append(p)
+
+            if not times:
+                return symbol, {
+                    'dates': [],
+                    'cumulative_return': [],
+                    'error': 'No data in range'
+                }
+
+            # Calculate cumulative % return from period start
+            # All values are relative to the first price in the period
+            base_price = prices[0]
+            scale = 100.0 / base_price
+            returns = [round((price - base_price) * scale, 4) for price in prices]
+
+            # Apply LTTB downsampling if needed
+            # Use index as X for LTTB to preserve visual shape without time gaps
+            if len(returns) > max_points:
+                # LTTB returns the kept points in order, so index straight
+                # back into the lists by their x (the original index)
+                downsampled = lttb_downsample(list(enumerate(returns)), max_points)
+                times = [times[idx] for idx, _ in downsampled]
+                returns = [val for _, val in downsampled]
+
+            # Format dates for labels - compact format for axis ticks
+            date_format = _DATE_FORMATS.get(interval, '%b %y')
+
+            # Create sequential indices and formatted date labels
+            indices = list(range(len(returns)))
+            date_labels = _format_date_labels(times, date_format)
+
+            return symbol, {
+                'indices': indices,
+                'date_labels': date_labels,
+                'cumulative_return': returns,
+                'interval': interval,
+                'raw_points': len(timestamps),
+                'displayed_points': len(returns),
+                'base_price': round(base_price, 2)
+            }
+        else:
+            return symbol, {
+                'dates': [],
+                'cumulative_return': [],
+                'error': 'No data available'
+            }
+
+    except Exception as e:
+        print(f"Error fetching data for {symbol}: {e}")
+        return symbol, {
+            'dates': [],
+            'cumulative_return': [],
+            'error': str(e)
+        }
+
+
 @external_bp.route('/api/stocks/daily-change', methods=['POST'])
 def get_stock_daily_change():
     """Get cumulative percentage return for stock symbols from period start.
@@ -24,6 +221,10 @@ def get_stock_daily_change():
         symbols: list of stock symbols
         days: number of days of data to fetch (0 = all available, default 30)
         max_points: maximum data points per symbol (uses LTTB downsampling, default 10000)
+
+    Streams NDJSON: one {"symbol": ..., "data": {...}} line per symbol, in
+    the order the fetches complete. Per-symbol failures are reported in
+    data['error'], as before.
     """
     try:
         data = request.get_json()
@@ -34,139 +235,24 @@ def get_stock_daily_change():
         if not symbols:
             return jsonify({'success': False, 'error': 'No symbols provided'}), 400
 
-        stock_data = {}
-
-        for symbol in symbols:
-            try:
-                # Use Yahoo Finance API to get stock data
-                # Choose interval based on date range for best resolution
-                end_date = datetime.now()
-
-                if requested_days == 0:
-                    # All time - use weekly interval
-                    start_date = end_date - timedelta(days=365 * 50)
-                    interval = '1wk'
-                elif requested_days <= 7:
-                    # 1 week or less - use 5 minute intervals for high resolution
-                    start_date = end_date - timedelta(days=requested_days + 1)
-                    interval = '5m'
-                elif requested_days <= 60:
-                    # Up to 2 months - use hourly intervals
-                    start_date = end_date - timedelta(days=requested_days + 1)
-                    interval = '1h'
-                elif requested_days <= 365 * 2:
-                    # Up to 2 years - use daily intervals
-                    start_date = end_date - timedelta(days=requested_days + 30)
-                    interval = '1d'
-                else:
-                    # More than 2 years - use weekly intervals
-                    start_date = end_date - timedelta(days=requested_days + 30)
-                    interval = '1wk'
-
-                period1 = int(start_date.timestamp())
-                period2 = int(end_date.timestamp())
-
-                url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}?period1={period1}&period2={period2}&interval={interval}"
-
-                req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-                with urllib.request.urlopen(req, timeout=15) as response:
-                    result = json.loads(response.read().decode())
-
-                if 'chart' in result and 'result' in result['chart'] and result['chart']['result']:
-                    chart_data = result['chart']['result'][0]
-                    timestamps = chart_data.get('timestamp', [])
-                    quotes = chart_data['indicators']['quote'][0]
-                    close_prices = quotes.get('close', [])
-
-                    if not timestamps or not close_prices:
-                        stock_data[symbol] = {
-                            'dates': [],
-                            'cumulative_return': [],
-                            'error': 'No data available'
-                        }
-                        continue
-
-                    # Filter to requested time range first
-                    if requested_days > 0:
-                        cutoff_time = end_date.timestamp() - (requested_days * 24 * 60 * 60)
-                        filtered_data = [
-                            (t, p) for t, p in zip(timestamps, close_prices)
-                            if t >= cutoff_time and p is not None
-                        ]
-                    else:
-                        filtered_data = [
-                            (t, p) for t, p in zip(timestamps, close_prices)
-                            if p is not None
-                        ]
-
-                    if not filtered_data:
-                        stock_data[symbol] = {
-                            'dates': [],
-                            'cumulative_return': [],
-                            'error': 'No data in range'
-                        }
-                        continue
-
-                    # Calculate cumulative % return from period start
-                    # All values are relative to the first price in the period
-                    base_price = filtered_data[0][1]
-                    raw_data = []  # List of (index, timestamp, cumulative_return)
-
-                    for idx, (t, price) in enumerate(filtered_data):
-                        cumulative_return = ((price - base_price) / base_price) * 100
-                        raw_data.append((idx, t, round(cumulative_return, 4)))
-
-                    # Apply LTTB downsampling if needed
-                    # Use index as X for LTTB to preserve visual shape without time gaps
-                    if len(raw_data) > max_points:
-                        lttb_input = [(idx, val) for idx, t, val in raw_data]
-                        downsampled_indices = set()
-                        downsampled = lttb_downsample(lttb_input, max_points)
-                        downsampled_indices = {int(idx) for idx, _ in downsampled}
-                        raw_data = [item for item in raw_data if item[0] in downsampled_indices]
-
-                    # Format dates for labels - compact format for axis ticks
-                    if interval in ['5m', '15m', '30m', '1h']:
-                        date_format = '%m/%d'  # Just month/day for intraday
-                    elif interval == '1d':
-                        date_format = '%b %d'  # "Jan 15" for daily
-                    else:
-                        date_format = '%b %y'  # "Jan 25" for weekly/longer
-
-                    # Create sequential indices and formatted date labels
-                    indices = list(range(len(raw_data)))
-                    date_labels = [datetime.fromtimestamp(t).strftime(date_format) for _, t, _ in raw_data]
-                    cumulative_returns = [val for _, _, val in raw_data]
-
-                    stock_data[symbol] = {
-                        'indices': indices,
-                        'date_labels': date_labels,
-                        'cumulative_return': cumulative_returns,
-                        'interval': interval,
-                        'raw_points': len(timestamps),
-                        'displayed_points': len(raw_data),
-                        'base_price': round(base_price, 2)
-                    }
-                else:
-                    stock_data[symbol] = {
-                        'dates': [],
-                        'cumulative_return': [],
-                        'error': 'No data available'
-                    }
-
-            except Exception as e:
-                print(f"Error fetching data for {symbol}: {e}")
-                stock_data[symbol] = {
-                    'dates': [],
-                    'cumulative_return': [],
-                    'error': str(e)
-                }
-
-        return jsonify({'success': True, 'data': stock_data})
-
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+    def generate():
+        # Fetch all symbols concurrently: wall time is ~one round trip rather
+        # than one per symbol. (Pool threads are green under eventlet.) Each
+        # result is sent as soon as it's ready, so the full set is never
+        # held as one dict or one encoded body.
+        workers = min(_MAX_STOCK_FETCH_WORKERS, len(symbols))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_fetch_symbol, symbol, requested_days, max_points)
+                       for symbol in symbols]
+            for future in as_completed(futures):
+                symbol, symbol_data = future.result()
+                yield json_utils.dumps_bytes({'symbol': symbol, 'data': symbol_data}) + b'\n'
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
 
 @external_bp.route('/api/weather', methods=['POST'])
 def get_weather():
@@ -187,9 +273,8 @@ def get_weather():
         last_error = None
         for attempt in range(max_retries):
             try:
-                req = urllib.request.Request(url, headers={'User-Agent': 'curl/7.68.0'})
-                with urllib.request.urlopen(req, timeout=15) as response:
-                    weather_data = json.loads(response.read().decode())
+                # This loop does its own (slower-paced) retries
+                weather_data = _get_json(url, headers={'User-Agent': 'curl/7.68.0'}, retries=False)
                 break
             except Exception as e:
                 last_error = e
@@ -215,7 +300,7 @@ def get_weather():
         if country and country != "United States of America":
             full_location += f", {country}"
 
-        return jsonify({
+        return json_response({
             'success': True,
             'temperature': float(temp_f),
             'condition': condition,
@@ -26,6 +26,8 @@ if not DEBUG_MODE:
 
 remote_machines_bp = Blueprint('remote_machines', __name__)
 
+_CONTROL_ACTIONS = frozenset({'start', 'stop'})
+
 
 def _emit_progress(machine_id, message):
     """Emit a progress update for a remote machine operation."""
@@ -61,7 +63,7 @@ def control_machine(machine_id):
     data = request.get_json()
     action = data.get('action')
 
-    if action not in ('start', 'stop'):
+    if action not in _CONTROL_ACTIONS:
         return jsonify({'success': False, 'error': 'Invalid action'}), 400
 
     config = get_remote_machine_config(machine_id)
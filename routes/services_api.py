@@ -1,13 +1,33 @@
 """Service-related API routes."""
+import threading
+
 from flask import Blueprint, jsonify, request
 
 from config_loader import get_all_services, get_service_config
-from app_state import service_status_lock, service_status_cache
+import app_state
+from app_state import DEBUG_MODE
 from utils import control_service
+from utils.cache_utils import TTLCache
+from utils.http_utils import PublishedJSONResponse, StaticJSONResponse
 from utils.subprocess_helper import run as subprocess_run
 
+# Import eventlet only if not in debug mode
+if not DEBUG_MODE:
+    import eventlet
+
 services_bp = Blueprint('services', __name__)
 
+_services_response = StaticJSONResponse(get_all_services)
+# Re-encoded only when the broadcaster publishes a new status snapshot
+_status_response = PublishedJSONResponse(lambda: app_state.service_status_cache)
+
+# `systemctl status` output per service, reused briefly so repeated opens of
+# the details modal (or several clients) share one subprocess
+_details_cache = TTLCache(maxsize=64)
+_DETAILS_TTL = 2.0
+
+_CONTROL_ACTIONS = frozenset({'start', 'stop'})
+
 
 # Optional callbacks for service control actions
 def on_service_start(service_name):
@@ -24,17 +44,30 @@ def on_service_stop(service_name):
     pass
 
 
+def _in_background(callback):
+    """Wrap a service callback so it runs off the request thread.
+
+    The /api/control response then only waits on systemctl, never on whatever
+    the callback drives (LEDs, GPIO, ...).
+    """
+    def fire(service_name):
+        if DEBUG_MODE:
+            threading.Thread(target=callback, args=(service_name,), daemon=True).start()
+        else:
+            eventlet.spawn_n(callback, service_name)
+    return fire
+
+
 @services_bp.route('/api/services')
 def get_services():
     """Get all service configurations."""
-    return jsonify(get_all_services())
+    return _services_response.response()
 
 
 @services_bp.route('/api/status')
 def get_status():
     """Get status of all services and connectivity (returns cached data)."""
-    with service_status_lock:
-        return jsonify(service_status_cache.copy())
+    return _status_response.response()
 
 
 @services_bp.route('/api/service/details/<service>')
@@ -48,16 +81,20 @@ def get_service_details(service):
     try:
         # Use service_name from config
         service_name = service_config['service_name']
-        result = subprocess_run(
-            ['systemctl', 'status', service_name],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        # Return the full output regardless of return code
+        output = _details_cache.get(service_name)
+        if output is None:
+            result = subprocess_run(
+                ['systemctl', 'status', service_name],
+                capture_output=True,
+                text=True,
+                timeout=5
+            )
+            # Keep the full output regardless of return code
+            output = result.stdout
+            _details_cache.set(service_name, output, _DETAILS_TTL)
         return jsonify({
             'success': True,
-            'output': result.stdout,
+            'output': output,
             'service': service
         })
     except Exception as e:
@@ -74,7 +111,7 @@ def control(service):
     data = request.get_json()
     action = data.get('action')  # 'start' or 'stop'
 
-    if action not in ['start', 'stop']:
+    if action not in _CONTROL_ACTIONS:
         return jsonify({'success': False, 'error': 'Invalid action'}), 400
 
     # Get service configuration
@@ -85,8 +122,8 @@ def control(service):
     success, error = control_service(
         service_config['service_name'],
         action,
-        on_start_callback=on_service_start,
-        on_stop_callback=on_service_stop
+        on_start_callback=_in_background(on_service_start),
+        on_stop_callback=_in_background(on_service_stop)
     )
 
     return jsonify({'success': success, 'error': error})
@@ -2,24 +2,35 @@
 from flask import Blueprint, jsonify, request
 
 import app_state
-from app_state import system_stats_lock, system_stats_cache, server_config_lock
-from utils import save_server_config
+from app_state import server_config_lock
+from utils import persist_server_config, publish_server_config
+from utils.http_utils import PublishedJSONResponse
 
 system_bp = Blueprint('system', __name__)
 
+# Re-encoded only when a new stats snapshot / config is published
+_system_response = PublishedJSONResponse(lambda: app_state.system_stats_cache)
+_server_config_response = PublishedJSONResponse(
+    lambda: app_state.server_config, prepare=dict)
+
+# Settable server config fields and their allowed (min, max) range in seconds
+_VALIDATORS = {
+    'system_stats_interval': (0.1, 60.0),
+    'service_status_interval': (1.0, 300.0),
+    'internet_check_interval': (1.0, 300.0),
+}
+
 
 @system_bp.route('/api/system')
 def get_system():
     """Get system statistics (returns cached data)."""
-    with system_stats_lock:
-        return jsonify(system_stats_cache.copy())
+    return _system_response.response()
 
 
 @system_bp.route('/api/server_config', methods=['GET'])
 def get_server_config():
     """Get current server configuration."""
-    with server_config_lock:
-        return jsonify(app_state.server_config.copy())
+    return _server_config_response.response()
 
 
 @system_bp.route('/api/server_config', methods=['POST'])
@@ -31,35 +42,28 @@ def set_server_config():
 
     updated = {}
     with server_config_lock:
-        # Validate and update system_stats_interval
-        if 'system_stats_interval' in data:
-            val = data['system_stats_interval']
-            if isinstance(val, (int, float)) and 0.1 <= val <= 60:
-                app_state.server_config['system_stats_interval'] = float(val)
-                updated['system_stats_interval'] = float(val)
-            else:
-                return jsonify({'success': False, 'error': 'system_stats_interval must be between 0.1 and 60 seconds'}), 400
+        # Edit a private copy; readers keep seeing the old config until the
+        # new one is published below.
+        new_config = dict(app_state.server_config)
 
-        # Validate and update service_status_interval
-        if 'service_status_interval' in data:
-            val = data['service_status_interval']
-            if isinstance(val, (int, float)) and 1 <= val <= 300:
-                app_state.server_config['service_status_interval'] = float(val)
-                updated['service_status_interval'] = float(val)
-            else:
-                return jsonify({'success': False, 'error': 'service_status_interval must be between 1 and 300 seconds'}), 400
+        # Validate and update each field present in the request
+        for field, (low, high) in _VALIDATORS.items():
+            if field not in data:
+                continue
+            val = data[field]
+            if not isinstance(val, (int, float)) or not low <= val <= high:
+                return jsonify({
+                    'success': False,
+                    'error': f'{field} must be between {low:g} and {high:g} seconds'
+                }), 400
+            new_config[field] = updated[field] = float(val)
 
-        # Validate and update internet_check_interval
-        if 'internet_check_interval' in data:
-            val = data['internet_check_interval']
-            if isinstance(val, (int, float)) and 1 <= val <= 300:
-                app_state.server_config['internet_check_interval'] = float(val)
-                updated['internet_check_interval'] = float(val)
-            else:
-                return jsonify({'success': False, 'error': 'internet_check_interval must be between 1 and 300 seconds'}), 400
-
-        # Persist to file if any changes were made
+        # Publish if any changes were made
         if updated:
-            save_server_config(app_state.server_config)
+            publish_server_config(new_config)
+
+    # Persist outside the lock, so file I/O never holds up other updates
+    if updated:
+        persist_server_config()
 
     return jsonify({'success': True, 'updated': updated})
@@ -8,25 +8,33 @@ This is the top-level application file that:
 4. Provides the WSGI application entry point
 """
 import os
+
+# Monkey patch for eventlet (only in production)
+# Must be done before importing anything that uses sockets, or that creates
+# locks/conditions at import time (app_state does) - those would otherwise be
+# native primitives that block the whole eventlet hub when waited on.
+if os.environ.get('DEBUG_MODE') != '1':
+    import eventlet
+    eventlet.monkey_patch()
+
+import atexit
 from datetime import timedelta
 
 from flask import Flask, url_for
 from flask_socketio import SocketIO
+from jinja2 import FileSystemBytecodeCache
 
-from app_state import DEBUG_MODE, set_socketio
-from utils import init_server_config
+from app_state import DEBUG_MODE, set_socketio, request_shutdown
+from utils import init_server_config, json_utils
+from utils.http_utils import FastJSONProvider
 from routes import register_blueprints
 from socketio_handlers import register_socketio_handlers
 from background import start_all_background_threads
 
-# Monkey patch for eventlet (only in production)
-# Must be done before importing anything that uses sockets
-if not DEBUG_MODE:
-    import eventlet
-    eventlet.monkey_patch()
-
 # Create Flask app
 app = Flask(__name__)
+# jsonify()/get_json() encode and decode with orjson when it's installed
+app.json = FastJSONProvider(app)
 # Generate a random secret key on startup for Flask session management
 app.config['SECRET_KEY'] = os.environ.get('FLASK_SECRET_KEY', os.urandom(24).hex())
 
@@ -34,6 +42,11 @@ app.config['SECRET_KEY'] = os.environ.get('FLASK_SECRET_KEY', os.urandom(24).hex
 # cache-busting ?v=<mtime> query appended by the versioned_static() Jinja helper below.
 app.config['SEND_FILE_MAX_AGE_DEFAULT'] = timedelta(days=30)
 
+# Persist compiled templates (in the system temp dir) so a restart doesn't
+# recompile them on each page's first hit. Jinja checks the source checksum,
+# so an edited template is still recompiled.
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
+
 
 @app.context_processor
 def inject_versioned_static():
@@ -51,9 +64,11 @@ def inject_versioned_static():
             return url
     return dict(versioned_static=versioned_static)
 
-# Create SocketIO with appropriate async mode
+# Create SocketIO with appropriate async mode. Packets are encoded with
+# json_utils (orjson when installed); a broadcast is encoded once and the same
+# text is sent to every client.
 async_mode = 'threading' if DEBUG_MODE else 'eventlet'
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode=async_mode)
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=async_mode, json=json_utils)
 
 # Store socketio instance in app_state for use by other modules
 set_socketio(socketio)
@@ -71,8 +86,9 @@ app.register_blueprint(timeseries_bp)
 # Register SocketIO event handlers
 register_socketio_handlers(socketio)
 
-# Start all background monitoring threads
+# Start all background monitoring threads (and let them exit cleanly)
 start_all_background_threads()
+atexit.register(request_shutdown)
 
 # Start timeseries data collector
 from timeseries import start_collector
@@ -1,7 +1,8 @@
 """SocketIO event handlers."""
-from flask_socketio import emit
+from flask_socketio import emit, join_room, leave_room
 
-from app_state import automation_state, automation_lock
+import app_state
+from app_state import automation_state, get_automation_public_state, MEMORY_SUBSCRIBERS_ROOM
 
 
 def register_socketio_handlers(socketio):
@@ -11,45 +12,50 @@ def register_socketio_handlers(socketio):
     def handle_connect():
         """Handle client connection - send current automation states."""
         print('Client connected')
+        # Full stats/status first (once the first tick has filled them):
+        # broadcasts mostly carry only what changed since the previous tick,
+        # so clients need this to merge into
+        if app_state.system_stats_cache:
+            emit('system_stats', app_state.system_stats_cache)
+        if app_state.service_status_cache:
+            emit('service_status', app_state.service_status_cache)
         # Send current state of all automations to the newly connected client
-        with automation_lock:
-            for automation_name, state in automation_state.items():
-                state_copy = state.copy()
-                state_copy.pop('process', None)
-                # Mark as full update (not incremental)
-                state_copy['incremental'] = False
-                emit('automation_update', {
-                    'automation': automation_name,
-                    'state': state_copy
-                })
+        for automation_name in automation_state:
+            emit('automation_update', {
+                'automation': automation_name,
+                'state': get_automation_public_state(automation_name)
+            })
 
     @socketio.on('disconnect')
     def handle_disconnect():
         """Handle client disconnection."""
         print('Client disconnected')
 
+    @socketio.on('subscribe_memory')
+    def handle_subscribe_memory():
+        """Client is showing service memory usage - include it in status broadcasts."""
+        join_room(MEMORY_SUBSCRIBERS_ROOM)
+
+    @socketio.on('unsubscribe_memory')
+    def handle_unsubscribe_memory():
+        """Client stopped showing service memory usage (e.g. tab hidden)."""
+        leave_room(MEMORY_SUBSCRIBERS_ROOM)
+
     @socketio.on('request_automation_state')
     def handle_request_state(data):
         """Handle explicit request for automation state."""
         automation_name = data.get('automation')
         if automation_name and automation_name in automation_state:
-            with automation_lock:
-                state = automation_state[automation_name].copy()
-                state.pop('process', None)
-                emit('automation_update', {
-                    'automation': automation_name,
-                    'state': state
-                })
+            emit('automation_update', {
+                'automation': automation_name,
+                'state': get_automation_public_state(automation_name)
+            })
 
     @socketio.on('request_all_automation_states')
     def handle_request_all_states():
         """Handle request for all automation states (after DOM is ready)."""
-        with automation_lock:
-            for automation_name, state in automation_state.items():
-                state_copy = state.copy()
-                state_copy.pop('process', None)
-                state_copy['incremental'] = False
-                emit('automation_update', {
-                    'automation': automation_name,
-                    'state': state_copy
-                })
+        for automation_name in automation_state:
+            emit('automation_update', {
+                'automation': automation_name,
+                'state': get_automation_public_state(automation_name)
+            })
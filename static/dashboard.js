@@ -433,6 +433,11 @@ function updateRemoteMachineUI(machineId, statusData) {
     }
 }
 
+// Last full service status / system stats. The server mostly pushes
+// *_delta events carrying only the keys that changed, merged into these.
+let serviceStatusState = {};
+let systemStatsState = {};
+
 // Handle service status update (from WebSocket or initial fetch)
 function handleServiceStatusUpdate(status) {
     // Dynamically update all configured services
@@ -458,6 +463,7 @@ async function fetchInitialStatus() {
     try {
         const response = await fetch('/api/status');
         const status = await response.json();
+        serviceStatusState = status;
         handleServiceStatusUpdate(status);
     } catch (error) {
         console.error('Error fetching initial status:', error);
@@ -531,8 +537,9 @@ function handleSystemStatsUpdate(stats) {
     if (stats.network_interface) {
         document.getElementById('network-interface').textContent =
             `INTERFACE: ${stats.network_interface}`;
-        document.getElementById('upload-value').textContent = stats.upload_mbps + ' Mbps';
-        document.getElementById('download-value').textContent = stats.download_mbps + ' Mbps';
+        // Speeds arrive as numbers; format here rather than on every server tick
+        document.getElementById('upload-value').textContent = Number(stats.upload_mbps).toFixed(2) + ' Mbps';
+        document.getElementById('download-value').textContent = Number(stats.download_mbps).toFixed(2) + ' Mbps';
     }
 
     // Update Network Status (hostname and IP)
@@ -562,6 +569,7 @@ async function fetchInitialSystemStats() {
     try {
         const response = await fetch('/api/system');
         const stats = await response.json();
+        systemStatsState = stats;
         handleSystemStatsUpdate(stats);
     } catch (error) {
         console.error('Error fetching initial system stats:', error);
@@ -1571,6 +1579,10 @@ const socket = io({
 
 socket.on('connect', () => {
     console.log('WebSocket connected');
+    // Service cards show memory usage; the server only measures it while
+    // some visible client has asked for it (rooms are per connection, so
+    // this is re-sent on every reconnect)
+    if (document.visibilityState === 'visible') socket.emit('subscribe_memory');
 });
 
 socket.on('disconnect', () => {
@@ -1585,7 +1597,11 @@ socket.on('connect_error', (error) => {
 // throttling — socket.io still reads `connected` but no messages flow.
 // On tab focus, pull fresh state over HTTP (what a manual refresh does).
 document.addEventListener('visibilitychange', () => {
-    if (document.visibilityState !== 'visible') return;
+    if (document.visibilityState !== 'visible') {
+        if (socket.connected) socket.emit('unsubscribe_memory');
+        return;
+    }
+    if (socket.connected) socket.emit('subscribe_memory');
     fetchInitialStatus();
     fetchInitialSystemStats();
     fetchInitialDeviceStatus();
@@ -1597,16 +1613,44 @@ socket.on('automation_update', (data) => {
     updateAutomationUI(data.automation, data.state);
 });
 
-// Handle system stats pushed from server
+// New output from a running automation: just the text to append. Applied
+// as an incremental update, but only while this client shows that same run
+// as running (the button holds its job id), so output racing a cancel or
+// completion can't flip the card back to RUNNING.
+socket.on('automation_output', (data) => {
+    const btn = document.getElementById(`${data.automation}-btn`);
+    if (!btn || btn.dataset.jobId !== data.job_id) return;
+    updateAutomationUI(data.automation, {
+        running: true,
+        job_id: data.job_id,
+        output: data.append,
+        incremental: true
+    });
+});
+
+// Handle system stats pushed from server: full snapshots (on connect and
+// periodically) replace the local copy, deltas are merged into it
 socket.on('system_stats', (stats) => {
+    systemStatsState = stats;
     handleSystemStatsUpdate(stats);
 });
 
-// Handle service status pushed from server
+socket.on('system_stats_delta', (delta) => {
+    systemStatsState = { ...systemStatsState, ...delta };
+    handleSystemStatsUpdate(systemStatsState);
+});
+
+// Handle service status pushed from server (full or delta, as above)
 socket.on('service_status', (status) => {
+    serviceStatusState = status;
     handleServiceStatusUpdate(status);
 });
 
+socket.on('service_status_delta', (delta) => {
+    serviceStatusState = { ...serviceStatusState, ...delta };
+    handleServiceStatusUpdate(serviceStatusState);
+});
+
 // Handle device status (media players, etc.) pushed from server
 socket.on('device_status', (status) => {
     handleDeviceStatusUpdate(status);
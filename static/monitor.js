@@ -268,6 +268,27 @@ function updateClock() {
     document.getElementById('hour-hand').style.transform = `rotate(${hoursDegrees}deg)`;
 }
 
+/**
+ * Read a newline-delimited JSON response, calling onRecord with each parsed
+ * line as it arrives
+ */
+async function readNdjson(response, onRecord) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffered = '';
+    for (;;) {
+        const { done, value } = await reader.read();
+        buffered += done ? decoder.decode() : decoder.decode(value, { stream: true });
+        const lines = buffered.split('\n');
+        // The last piece is a partial line (or '') until more arrives
+        buffered = done ? '' : lines.pop();
+        for (const line of lines) {
+            if (line.trim()) onRecord(JSON.parse(line));
+        }
+        if (done) return;
+    }
+}
+
 /**
  * Update stock chart with daily percentage changes
  */
@@ -296,15 +317,15 @@ async function updateStockChart() {
             throw new Error(`HTTP error! status: ${response.status}`);
         }
 
-        const data = await response.json();
-
-        if (!data.success) {
-            throw new Error(data.error || 'Failed to fetch stock data');
-        }
+        // One {symbol, data} record per line, in whatever order the
+        // server's fetches finished
+        const stockData = {};
+        await readNdjson(response, (record) => {
+            stockData[record.symbol] = record.data;
+        });
 
         // Prepare data for plotting
         const traces = [];
-        const stockData = data.data;
 
         // Collect all date labels for X-axis tick labels
         // Use the first symbol's labels as reference for tick positions
@@ -0,0 +1,84 @@
+"""Tests for get_services_state()'s parsing of `systemctl show` output."""
+
+import subprocess
+
+import pytest
+
+from utils import service_utils
+
+
+def _fake_systemctl(outputs, calls):
+    """Return a stand-in for _run() that answers `systemctl show` from outputs.
+
+    outputs maps a tuple of unit names to the stdout systemctl would print
+    for them; every call's unit names are recorded in calls.
+    """
+    def run(cmd, **kwargs):
+        units = tuple(cmd[cmd.index('--') + 1:])
+        calls.append(units)
+        return subprocess.CompletedProcess(cmd, 0, stdout=outputs[units], stderr='')
+    return run
+
+
+@pytest.fixture
+def systemctl(monkeypatch):
+    """Route get_services_state() to canned systemctl output (never D-Bus)."""
+    monkeypatch.setattr(service_utils, 'Unit', None)
+    calls = []
+
+    def install(outputs):
+        monkeypatch.setattr(service_utils, '_run', _fake_systemctl(outputs, calls))
+        return calls
+    return install
+
+
+def test_one_call_for_all_units(systemctl):
+    """Each unit's stanza is matched to it by position, from a single call."""
+    calls = systemctl({
+        ('smbd', 'minidlna'): (
+            'MainPID=812\nActiveState=active\n'
+            '\n'
+            'MainPID=0\nActiveState=inactive\n'
+        ),
+    })
+
+    states = service_utils.get_services_state(['smbd', 'minidlna'])
+
+    assert states == {
+        'smbd': {'active': True, 'main_pid': 812},
+        'minidlna': {'active': False, 'main_pid': 0},
+    }
+    assert calls == [('smbd', 'minidlna')]
+
+
+def test_active_unit_without_main_process(systemctl):
+    """An active unit with MainPID=0 (e.g. a oneshot) is running with no pid."""
+    systemctl({('mount-media',): 'MainPID=0\nActiveState=active\n'})
+
+    states = service_utils.get_services_state(['mount-media'])
+
+    assert states == {'mount-media': {'active': True, 'main_pid': 0}}
+
+
+def test_missing_stanza_falls_back_to_one_call_per_unit(systemctl):
+    """When systemctl skips a unit, positions aren't trusted; each unit is re-queried."""
+    calls = systemctl({
+        # 'bogus' was rejected outright: only two stanzas for three units
+        ('smbd', 'bogus', 'gateway'): (
+            'MainPID=812\nActiveState=active\n'
+            '\n'
+            'MainPID=1040\nActiveState=active\n'
+        ),
+        ('smbd',): 'MainPID=812\nActiveState=active\n',
+        ('bogus',): '',
+        ('gateway',): 'MainPID=1040\nActiveState=active\n',
+    })
+
+    states = service_utils.get_services_state(['smbd', 'bogus', 'gateway'])
+
+    assert states == {
+        'smbd': {'active': True, 'main_pid': 812},
+        'bogus': {'active': False, 'main_pid': 0},
+        'gateway': {'active': True, 'main_pid': 1040},
+    }
+    assert calls == [('smbd', 'bogus', 'gateway'), ('smbd',), ('bogus',), ('gateway',)]
@@ -0,0 +1,104 @@
+"""Tests for the /proc-based top CPU process sweep in system_utils."""
+
+import types
+
+import pytest
+
+from utils import system_utils
+
+CLK_TCK = 100
+
+
+def _stat_line(pid, comm, utime, stime, starttime):
+    """Build a /proc/<pid>/stat line with the given comm and CPU/start times."""
+    # Fields 3-13 (state .. cmajflt), then utime (14) and stime (15), then
+    # fields 16-21, then starttime (22) and a few trailing fields
+    before = 'S 1 1 1 0 -1 4194560 100 0 0 0'
+    between = '0 0 20 0 1 0'
+    return f'{pid} ({comm}) {before} {utime} {stime} {between} {starttime} 0 0 0'.encode()
+
+
+@pytest.mark.parametrize('comm', ['bash', 'tmux: server', 'a) b', ') (', 'x)'])
+def test_parse_proc_stat_odd_names(comm):
+    """Fields are counted from the last ')', whatever the process name holds."""
+    name, cpu_ticks, start_ticks = system_utils._parse_proc_stat(
+        _stat_line(42, comm, utime=30, stime=12, starttime=5000))
+    assert name == comm
+    assert cpu_ticks == 42
+    assert start_ticks == 5000
+
+
+@pytest.fixture
+def proc(monkeypatch):
+    """A fake process table and clock for get_top_cpu_processes().
+
+    Returns (table, clock): table maps pid -> (comm, cpu_ticks, start_ticks)
+    and clock[0] is the monotonic time; both can be changed between sweeps.
+    """
+    table = {}
+    clock = [1000.0]
+    monkeypatch.setattr(system_utils, '_prev_cpu_times', {})
+    monkeypatch.setattr(system_utils, '_CLK_TCK', CLK_TCK)
+    monkeypatch.setattr(system_utils, 'time', types.SimpleNamespace(monotonic=lambda: clock[0]))
+    monkeypatch.setattr(system_utils, '_read_uptime', lambda: 10000.0)
+    monkeypatch.setattr(system_utils, '_list_pids', lambda: list(table))
+
+    def read_proc_stat(pid):
+        comm, ticks, start = table[pid]
+        return system_utils._parse_proc_stat(
+            _stat_line(pid, comm, utime=ticks, stime=0, starttime=start))
+    monkeypatch.setattr(system_utils, '_read_proc_stat', read_proc_stat)
+    return table, clock
+
+
+def _ranking(top):
+    return [(p['pid'], p['cpu_percent']) for p in top]
+
+
+def test_first_sweep_ranks_by_lifetime_average(proc):
+    """With no previous sample, every process gets CPU time over its lifetime."""
+    table, _ = proc
+    # Started at 9000 s of a 10000 s uptime: 1000 s alive
+    table[10] = ('idle-now', 500 * CLK_TCK, 9000 * CLK_TCK)  # 500 s of CPU -> 50%
+    table[20] = ('steady', 100 * CLK_TCK, 9000 * CLK_TCK)    # 100 s of CPU -> 10%
+
+    assert _ranking(system_utils.get_top_cpu_processes()) == [(10, 50.0), (20, 10.0)]
+
+
+def test_later_sweeps_rank_current_usage_only(proc):
+    """Known processes are ranked by usage since the last sweep; new ones wait a sweep."""
+    table, clock = proc
+    table[10] = ('idle-now', 500 * CLK_TCK, 9000 * CLK_TCK)
+    table[20] = ('steady', 100 * CLK_TCK, 9000 * CLK_TCK)
+    system_utils.get_top_cpu_processes()
+
+    # 2 s later: pid 10 did nothing, pid 20 used 1 s of CPU. Pid 30 is new
+    # and busy over its lifetime, but has no interval yet, so isn't ranked.
+    clock[0] += 2.0
+    table[20] = ('steady', 101 * CLK_TCK, 9000 * CLK_TCK)
+    table[30] = ('old-hog', 900 * CLK_TCK, 0)
+
+    assert _ranking(system_utils.get_top_cpu_processes()) == [(20, 50.0), (10, 0.0)]
+
+    # On the next sweep it has an interval like everyone else
+    clock[0] += 2.0
+    table[30] = ('old-hog', 900 * CLK_TCK + 40, 0)
+
+    assert _ranking(system_utils.get_top_cpu_processes()) == [(30, 20.0), (20, 0.0), (10, 0.0)]
+
+
+def test_reused_pid_is_not_measured_against_the_old_process(proc):
+    """A pid whose start time changed is a different process: no interval yet."""
+    table, clock = proc
+    table[10] = ('old', 500 * CLK_TCK, 9000 * CLK_TCK)
+    table[20] = ('steady', 100 * CLK_TCK, 9000 * CLK_TCK)
+    system_utils.get_top_cpu_processes()
+
+    # Pid 10 exited and was reused by a process that has used less CPU in
+    # total; comparing it with the old one would give a bogus figure
+    clock[0] += 2.0
+    table[10] = ('new', 3 * CLK_TCK, 9990 * CLK_TCK)
+    table[20] = ('steady', 100 * CLK_TCK + 20, 9000 * CLK_TCK)
+
+    assert _ranking(system_utils.get_top_cpu_processes()) == [(20, 10.0)]
+    assert system_utils._prev_cpu_times[10][1] == 9990 * CLK_TCK
@@ -6,10 +6,9 @@ timeseries and stores the data in the database.
 """
 
 import threading
-import time
 
-import app_state
-from app_state import server_config_lock
+from app_state import wait_interval, wake_background_loops
+from utils import ServerConfigValue
 from .config import get_all_timeseries
 from .routes import get_timeseries_db
 
@@ -41,18 +40,16 @@ class TimeseriesCollector:
             return
 
         self.running = False
+        wake_background_loops()
         if self.thread:
             self.thread.join(timeout=5)
         print("Timeseries collector stopped")
 
     def _collection_loop(self):
         """Main collection loop."""
+        sampling_interval = ServerConfigValue('timeseries_sampling_interval')
         while self.running:
             try:
-                # Get sampling interval from server config
-                with server_config_lock:
-                    sampling_rate_seconds = app_state.server_config['timeseries_sampling_interval']
-
                 # Collect data from all timeseries
                 datapoints = []
                 for ts in get_all_timeseries():
@@ -72,8 +69,10 @@ class TimeseriesCollector:
             except Exception as e:
                 print(f"Error in timeseries collection loop: {e}")
 
-            # Sleep for the configured sampling rate
-            time.sleep(sampling_rate_seconds)
+            # Sleep for the configured sampling rate (woken early by a config
+            # change, stop() or shutdown)
+            if wait_interval(sampling_interval.get()):
+                break
 
 
 # Global collector instance
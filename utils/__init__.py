@@ -1,9 +1,17 @@
 """Utility modules for the Raspberry Pi Dashboard."""
 from .subprocess_helper import run as subprocess_run
-from .server_config import load_server_config, save_server_config, init_server_config
+from .server_config import (
+    load_server_config,
+    save_server_config,
+    persist_server_config,
+    publish_server_config,
+    init_server_config,
+    ServerConfigValue,
+)
 from .service_utils import (
-    check_service_status,
-    get_service_memory_usage,
+    get_services_state,
+    get_process_tree_memory,
+    get_children_map,
     control_service,
 )
 from .system_utils import get_uname, get_top_cpu_processes, get_system_stats
@@ -0,0 +1,60 @@
+"""Small in-process caches."""
+import functools
+import threading
+import time
+
+
+class TTLCache:
+    """A bounded mapping whose entries expire `ttl` seconds after being set.
+
+    Reads take no lock (a dict lookup of an immutable (expires_at, value)
+    tuple is atomic under the GIL); only set() locks, to keep eviction
+    consistent. When full, expired entries are dropped first, then the
+    oldest ones.
+    """
+
+    def __init__(self, maxsize=256):
+        self._maxsize = maxsize
+        self._data = {}  # key -> (expires_at, value), in insertion order
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing/expired."""
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return default
+        return entry[1]
+
+    def set(self, key, value, ttl):
+        """Cache value under key for ttl seconds."""
+        with self._lock:
+            now = time.monotonic()
+            self._data.pop(key, None)  # Re-insert at the end (newest)
+            if len(self._data) >= self._maxsize:
+                for k in [k for k, (expires_at, _) in self._data.items() if expires_at <= now]:
+                    del self._data[k]
+                while len(self._data) >= self._maxsize:
+                    del self._data[next(iter(self._data))]
+            self._data[key] = (now + ttl, value)
+
+
+def ttl_cache(ttl, maxsize=128):
+    """Memoize a function per positional-arguments tuple for `ttl` seconds.
+
+    For cheap-to-repeat probes (subprocesses, file reads) where a result a
+    couple of seconds old is as good as a fresh one, so bursts of callers
+    share one call.
+    """
+    def decorator(func):
+        cache = TTLCache(maxsize)
+        missing = object()
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            value = cache.get(args, missing)
+            if value is missing:
+                value = func(*args)
+                cache.set(args, value, ttl)
+            return value
+        return wrapper
+    return decorator
@@ -0,0 +1,88 @@
+"""HTTP response helpers for Flask routes."""
+import hashlib
+
+from flask import current_app, request
+from flask.json.provider import DefaultJSONProvider
+
+from utils import json_utils
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, encoding and decoding with json_utils (orjson if installed).
+
+    Installed as app.json, so jsonify(), request.get_json() and
+    current_app.json all use it. Types orjson doesn't know still go through
+    Flask's default() hook. Keys aren't sorted (sort_keys is stdlib-only).
+    """
+
+    def dumps(self, obj, **kwargs):
+        kwargs.setdefault('default', self.default)
+        return json_utils.dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        return json_utils.loads(s, **kwargs)
+
+
+def json_response(obj, status=200):
+    """Return obj as a JSON response, encoded with json_utils (orjson if installed).
+
+    A faster jsonify() for large payloads. Unlike jsonify() it doesn't sort
+    keys or pretty-print in debug mode.
+    """
+    return current_app.response_class(
+        json_utils.dumps_bytes(obj), status=status, mimetype='application/json')
+
+
+class PublishedJSONResponse:
+    """A JSON response for a published object (see app_state's caches).
+
+    Published objects are replaced, never mutated, so a serialized body stays
+    valid for as long as the same object is published. `get` returns the
+    current object; it's encoded on the first request after it changes and
+    the bytes are reused until the next publish - requests in between do no
+    copying or encoding. `prepare`, if given, turns the object into something
+    JSON-serializable (e.g. dict() of a MappingProxyType) before encoding.
+    """
+
+    def __init__(self, get, prepare=None):
+        self._get = get
+        self._prepare = prepare
+        self._cached = (None, None)  # (published object, its JSON bytes)
+
+    def response(self):
+        """Return the current object as a JSON response."""
+        obj = self._get()
+        cached_obj, body = self._cached
+        if obj is not cached_obj or body is None:
+            body = json_utils.dumps_bytes(self._prepare(obj) if self._prepare else obj)
+            # One tuple, so a concurrent request never pairs an object with
+            # another object's body
+            self._cached = (obj, body)
+        return current_app.response_class(body, mimetype='application/json')
+
+
+class StaticJSONResponse:
+    """A JSON response whose body is fixed for the life of the process.
+
+    For endpoints that serve config loaded once at startup (changing it needs
+    a restart anyway). The body is serialized and hashed on first use; after
+    that each request is a conditional-GET check, and clients that send back
+    the ETag get an empty 304 instead of the JSON.
+    """
+
+    def __init__(self, build):
+        self._build = build  # Called once, returns the object to serialize
+        self._body = None
+        self._etag = None
+
+    def response(self):
+        """Return the cached body (or a 304) for the current request."""
+        if self._body is None:
+            body = current_app.json.dumps(self._build()).encode()
+            self._etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+            self._body = body
+        resp = current_app.response_class(self._body, mimetype='application/json')
+        resp.set_etag(self._etag)
+        # Let browsers keep a copy but revalidate it every time (cheap 304)
+        resp.cache_control.no_cache = True
+        return resp.make_conditional(request)
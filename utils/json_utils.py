@@ -0,0 +1,39 @@
+"""Fast JSON encode/decode.
+
+A drop-in for the stdlib json module's dumps()/loads(), so it can be handed to
+anything that takes a `json=` module (Flask-SocketIO does). Uses orjson when
+installed - several times faster at encoding the stats payloads broadcast
+every tick - and falls back to the stdlib json module otherwise.
+"""
+import json
+
+try:
+    import orjson
+
+    def dumps(obj, default=None, **kwargs):
+        """Serialize obj to a compact JSON str (stdlib-only kwargs are ignored).
+
+        default, as in json.dumps(), converts objects orjson can't serialize.
+        """
+        return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def dumps_bytes(obj):
+        """Serialize obj to compact UTF-8 JSON bytes (e.g. an HTTP body)."""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(s, **kwargs):
+        """Deserialize a JSON str or bytes."""
+        return orjson.loads(s)
+except ImportError:
+    def dumps(obj, **kwargs):
+        """Serialize obj to a compact JSON str."""
+        kwargs.setdefault('separators', (',', ':'))
+        return json.dumps(obj, **kwargs)
+
+    def dumps_bytes(obj):
+        """Serialize obj to compact UTF-8 JSON bytes (e.g. an HTTP body)."""
+        return json.dumps(obj, separators=(',', ':')).encode()
+
+    def loads(s, **kwargs):
+        """Deserialize a JSON str or bytes."""
+        return json.loads(s, **kwargs)
@@ -1,11 +1,21 @@
 """Network and internet connectivity utilities."""
-from utils.subprocess_helper import run as subprocess_run
+import errno
+import select
+import socket
+import time
+
+from utils.procfs import ProcFile
 
 # Kernel routing table. Columns: Iface Destination Gateway Flags RefCnt Use
 # Metric Mask MTU Window IRTT. Addresses are little-endian hex, so the default
 # route (0.0.0.0/0) is the row whose Destination is all zeros.
 _ROUTE_FILE = '/proc/net/route'
 
+# Per-interface traffic counters. After the "iface:" prefix the columns are
+# rx bytes/packets/errs/drop/fifo/frame/compressed/multicast followed by the
+# same eight for tx, so rx bytes is field 0 and tx bytes is field 8.
+_net_dev = ProcFile('/proc/net/dev')
+
 
 def get_primary_interface(fallback=None):
     """Return the interface carrying the default route.
@@ -36,19 +46,66 @@ def get_primary_interface(fallback=None):
         return fallback
 
 
+def read_interface_bytes(interface):
+    """Return (rx_bytes, tx_bytes) for `interface`, or None if it isn't listed.
+
+    Called at 10 Hz by the network monitor, so it picks the one line it needs
+    out of a single pread() of an already-open /proc/net/dev rather than going
+    through psutil.net_io_counters(pernic=True), which builds a named tuple
+    for every interface on each call.
+    """
+    prefix = interface.encode() + b':'
+    for line in _net_dev.read().split(b'\n')[2:]:  # two header lines
+        line = line.lstrip()
+        if line.startswith(prefix):
+            fields = line[len(prefix):].split()
+            return int(fields[0]), int(fields[8])
+    return None
+
+
+# Public DNS servers (Google, Cloudflare) - their TCP port 53 answers whenever
+# the internet is reachable
+_INTERNET_PROBE_HOSTS = ('8.8.8.8', '1.1.1.1')
+_INTERNET_PROBE_PORT = 53
+_INTERNET_PROBE_TIMEOUT = 2
+
+
 def check_internet_connectivity():
-    """Check internet connectivity by pinging DNS servers."""
-    hosts = ['8.8.8.8', '1.1.1.1']  # Google DNS and Cloudflare DNS
-
-    for host in hosts:
-        try:
-            result = subprocess_run(
-                ['ping', '-c', '1', '-W', '2', host],
-                capture_output=True,
-                timeout=3
-            )
-            if result.returncode == 0:
+    """Check internet connectivity by opening a TCP connection to a DNS server.
+
+    A bare connect - no child process to fork or ping output to parse, and
+    under eventlet the socket and select() are green, so waiting doesn't block
+    the hub. All hosts are tried at once and the first completed connection
+    wins, so one unreachable host costs nothing while another answers.
+    """
+    socks = []
+    try:
+        pending = []
+        for host in _INTERNET_PROBE_HOSTS:
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            socks.append(s)
+            s.setblocking(False)
+            err = s.connect_ex((host, _INTERNET_PROBE_PORT))
+            if err == 0:
                 return True
-        except Exception:
-            continue
-    return False
+            if err in (errno.EINPROGRESS, errno.EWOULDBLOCK):
+                pending.append(s)
+            # Anything else (e.g. ENETUNREACH) failed on the spot
+
+        deadline = time.monotonic() + _INTERNET_PROBE_TIMEOUT
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            _, writable, _ = select.select([], pending, [], remaining)
+            for s in writable:
+                # Writable means the connect finished; SO_ERROR says how
+                if s.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+                    return True
+                pending.remove(s)
+        return False
+    except OSError:
+        return False
+    finally:
+        for s in socks:
+            s.close()
@@ -0,0 +1,38 @@
+"""Cheap repeated reads of small /proc and /sys files."""
+import os
+
+
+class ProcFile:
+    """A procfs/sysfs file kept open and re-read from offset 0 on each read().
+
+    The kernel regenerates these files on every read from offset 0, so one
+    open() serves the life of the process and each read() is a single pread()
+    syscall - no reopen, no seek, no text-layer decode.
+    """
+
+    def __init__(self, path, bufsize=8192):
+        self.path = path
+        self._bufsize = bufsize
+        self._fd = None
+
+    def read(self):
+        """Return the file's current contents as bytes."""
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_RDONLY | os.O_CLOEXEC)
+        try:
+            while True:
+                data = os.pread(self._fd, self._bufsize, 0)
+                if len(data) < self._bufsize:
+                    return data
+                # Filled the buffer, so there may be more: grow it and re-read
+                self._bufsize *= 2
+        except OSError:
+            # e.g. ENODEV after a sysfs device went away: reopen next time
+            self.close()
+            raise
+
+    def close(self):
+        """Close the file; the next read() reopens it."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
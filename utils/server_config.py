@@ -1,9 +1,14 @@
 """Server configuration load/save utilities."""
 import json
 import os
+from types import MappingProxyType
 
 import app_state
-from app_state import SERVER_CONFIG_FILE, SERVER_CONFIG_DEFAULTS
+from app_state import SERVER_CONFIG_FILE, SERVER_CONFIG_DEFAULTS, make_lock
+
+# Serializes persist_server_config() writes (file I/O only - never held
+# together with server_config_lock)
+_save_lock = make_lock()
 
 
 def load_server_config():
@@ -39,7 +44,45 @@ def save_server_config(config):
         return False
 
 
+def persist_server_config():
+    """Save the currently published server config. Call WITHOUT server_config_lock held.
+
+    Saves are serialized and each writes whatever is published at that
+    moment, so overlapping updates always leave the newest config on disk.
+    """
+    with _save_lock:
+        return save_server_config(dict(app_state.server_config))
+
+
+def publish_server_config(config):
+    """Publish a new (read-only) server config. Call with server_config_lock held."""
+    app_state.server_config = MappingProxyType(config)
+    app_state.server_config_version += 1
+    app_state.wake_background_loops()
+
+
 def init_server_config():
-    """Initialize server config and store in app_state."""
-    app_state.server_config = load_server_config()
+    """Initialize server config and publish it (read-only) in app_state."""
+    with app_state.server_config_lock:
+        publish_server_config(load_server_config())
     return app_state.server_config
+
+
+class ServerConfigValue:
+    """One server config setting, cached by a long-running background loop.
+
+    get() only goes back to app_state.server_config when server_config_version
+    has moved, so the steady-state cost per tick is one integer comparison.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self._version = None
+        self._value = None
+
+    def get(self):
+        version = app_state.server_config_version
+        if version != self._version:
+            self._value = app_state.server_config[self.key]
+            self._version = version
+        return self._value
@@ -1,67 +1,192 @@
 """Service status checking and control utilities."""
+import time
+
 import psutil
 
+from app_state import make_lock
 from utils.subprocess_helper import run as _run
 
+# pystemd, if installed, reads unit properties straight from systemd over
+# D-Bus; otherwise (or if the bus is unavailable) systemctl is forked instead
+try:
+    from pystemd.dbuslib import DBus
+    from pystemd.systemd1 import Unit
+except ImportError:
+    DBus = Unit = None
+
+# pystemd's calls block in C, so under eventlet they run in a real OS thread
+# (like subprocess_helper.run()) rather than stalling the hub on a slow bus
+try:
+    import eventlet.patcher
+    if eventlet.patcher.is_monkey_patched('os'):
+        from eventlet.tpool import execute as _blocking_call
+    else:
+        _blocking_call = None
+except ImportError:
+    _blocking_call = None
+
+# One system bus connection and one loaded Unit per service, reused across
+# calls. sd-bus connections aren't thread-safe, so all use is under the lock.
+_dbus_lock = make_lock()
+_dbus = None
+_dbus_units = {}
+# After a D-Bus failure, use systemctl for this many seconds before retrying
+_DBUS_RETRY_DELAY = 60.0
+_dbus_retry_at = 0.0
+
+
+def _unit_file_name(service_name):
+    """Full unit name for service_name (systemctl assumes .service; D-Bus doesn't)."""
+    return service_name if '.' in service_name else f'{service_name}.service'
+
+
+def _dbus_query(service_names):
+    """Read ActiveState and MainPID for service_names. Call with _dbus_lock held."""
+    global _dbus
+    if _dbus is None:
+        bus = DBus(system=True)
+        bus.open()
+        _dbus = bus
+    states = {}
+    for name in service_names:
+        unit = _dbus_units.get(name)
+        if unit is None:
+            unit = Unit(_unit_file_name(name).encode(), bus=_dbus, _autoload=True)
+            _dbus_units[name] = unit
+        states[name] = {
+            'active': unit.Unit.ActiveState == b'active',
+            'main_pid': unit.Service.MainPID,
+        }
+    return states
+
+
+def _dbus_services_state(service_names):
+    """get_services_state() via pystemd, or None if it's unavailable or fails.
+
+    Each property is one D-Bus Get on an already-loaded unit - no fork/exec.
+    """
+    global _dbus, _dbus_retry_at
+    if Unit is None or time.monotonic() < _dbus_retry_at:
+        return None
+    with _dbus_lock:
+        try:
+            if _blocking_call:
+                return _blocking_call(_dbus_query, service_names)
+            return _dbus_query(service_names)
+        except Exception as e:
+            print(f"D-Bus status check failed, falling back to systemctl: {e}")
+            # Reconnect from scratch next time (e.g. systemd was re-executed)
+            _dbus = None
+            _dbus_units.clear()
+            _dbus_retry_at = time.monotonic() + _DBUS_RETRY_DELAY
+            return None
+
+
+def get_services_state(service_names):
+    """Get ActiveState and MainPID for several systemd services in one call.
+
+    `systemctl show` accepts many units and prints one blank-line separated
+    stanza per unit, in argument order, so a whole status sweep costs a single
+    fork/exec instead of two per service. With pystemd installed the
+    properties are read over D-Bus instead, with no fork at all.
+
+    Returns:
+        dict: {service_name: {'active': bool, 'main_pid': int}} (main_pid is 0
+        when the service has no running main process)
+    """
+    if service_names:
+        states = _dbus_services_state(service_names)
+        if states is not None:
+            return states
+
+    states = {name: {'active': False, 'main_pid': 0} for name in service_names}
+    if not service_names:
+        return states
 
-def check_service_status(service_name):
-    """Check if a systemd service is active."""
     try:
         result = _run(
-            ['systemctl', 'is-active', service_name],
+            ['systemctl', 'show', '--property=ActiveState,MainPID', '--', *service_names],
             capture_output=True,
             text=True,
             timeout=5
         )
-        return result.stdout.strip() == 'active'
+        stanzas = result.stdout.strip().split('\n\n')
+        if len(stanzas) != len(service_names):
+            # A unit systemctl rejected outright gets no stanza, so positions
+            # no longer line up; query one at a time rather than mislabel.
+            if len(service_names) > 1:
+                for name in service_names:
+                    states.update(get_services_state([name]))
+            return states
+
+        for name, stanza in zip(service_names, stanzas):
+            props = dict(line.split('=', 1) for line in stanza.splitlines() if '=' in line)
+            states[name] = {
+                'active': props.get('ActiveState') == 'active',
+                'main_pid': int(props.get('MainPID') or 0),
+            }
     except Exception as e:
-        print(f"Error checking {service_name}: {e}")
-        return False
+        print(f"Error checking services {service_names}: {e}")
+    return states
 
 
-def get_service_memory_usage(service_name):
-    """Get memory usage (RSS) in bytes for a systemd service, including child processes.
+def get_children_map():
+    """Return {ppid: [child pids]} for every process, from one scan of /proc.
 
-    Args:
-        service_name: The systemd service unit name
-
-    Returns:
-        int: Memory usage in bytes, or None if service is not running or can't be determined
+    Process.children(recursive=True) rescans the whole process table on each
+    call; building this once lets a sweep over many services share one scan
+    (see get_process_tree_memory()).
     """
     try:
-        result = _run(
-            ['systemctl', 'show', '-p', 'MainPID', service_name],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if result.returncode != 0:
-            return None
+        # Private, but it's exactly what Process.children() uses internally
+        ppids = psutil._psplatform.ppid_map()
+    except AttributeError:
+        ppids = {p.info['pid']: p.info['ppid'] for p in psutil.process_iter(['ppid'])}
+    children = {}
+    for pid, ppid in ppids.items():
+        children.setdefault(ppid, []).append(pid)
+    return children
 
-        main_pid_str = result.stdout.strip().split('=')[1]
-        if not main_pid_str or main_pid_str == '0':
-            return None
 
-        main_pid = int(main_pid_str)
-        if main_pid == 0:
-            return None
+def get_process_tree_memory(main_pid, children_map=None):
+    """Get memory usage (RSS) in bytes of a process and all of its children.
 
-        try:
-            main_process = psutil.Process(main_pid)
-            total_memory = main_process.memory_info().rss
+    Args:
+        main_pid: PID of the root process (e.g. a service's MainPID)
+        children_map: Optional get_children_map() result to find the children
+            in, instead of scanning the process table for this call
+
+    Returns:
+        int: Memory usage in bytes, or None if the process can't be read
+    """
+    if not main_pid:
+        return None
 
-            for child in main_process.children(recursive=True):
+    try:
+        main_process = psutil.Process(main_pid)
+        total_memory = main_process.memory_info().rss
+
+        if children_map is None:
+            children = main_process.children(recursive=True)
+        else:
+            children = []
+            stack = list(children_map.get(main_pid, ()))
+            while stack:
+                pid = stack.pop()
+                stack.extend(children_map.get(pid, ()))
                 try:
-                    total_memory += child.memory_info().rss
+                    children.append(psutil.Process(pid))
                 except (psutil.NoSuchProcess, psutil.AccessDenied):
                     continue
 
-            return total_memory
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            return None
+        for child in children:
+            try:
+                total_memory += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
 
-    except Exception as e:
-        print(f"Error getting memory usage for {service_name}: {e}")
+        return total_memory
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
         return None
 
 
@@ -0,0 +1,61 @@
+"""Socket.IO broadcast helpers."""
+from app_state import get_socketio
+
+
+def broadcast(event, payload):
+    """Emit an event to every client on the default namespace.
+
+    A no-op until the SocketIO instance is set. A single emit: the packet is
+    encoded once and the same bytes are written to every client.
+    """
+    socketio = get_socketio()
+    if not socketio:
+        return
+    socketio.emit(event, payload, namespace='/')
+
+
+def room_has_members(room):
+    """Return whether any client has joined room on the default namespace.
+
+    Fails open (True) if the server manager's internals are unexpected, so
+    callers gating work on it keep doing that work rather than silently
+    dropping it. False until the SocketIO instance is set.
+    """
+    socketio = get_socketio()
+    if not socketio:
+        return False
+    try:
+        return bool(socketio.server.manager.rooms.get('/', {}).get(room))
+    except Exception:
+        return True
+
+
+class DeltaBroadcaster:
+    """Broadcasts a periodically refreshed dict, sending only what changed.
+
+    send() emits `<event>_delta` with just the top-level keys whose values
+    differ from the last payload sent, or nothing if none do. Every
+    `full_every`-th send is the whole dict as `<event>`, a safety net for a
+    client that missed a delta; new clients get the full dict on connect (see
+    socketio_handlers). Clients merge deltas into the last full dict.
+    """
+
+    def __init__(self, event, full_every=30):
+        self.event = event
+        self.delta_event = f'{event}_delta'
+        self.full_every = full_every
+        self._last = None
+        self._sends = 0
+
+    def send(self, payload):
+        """Broadcast payload (a published dict - never mutated afterwards)."""
+        last = self._last
+        self._last = payload
+        self._sends += 1
+        if last is None or self._sends >= self.full_every:
+            self._sends = 0
+            broadcast(self.event, payload)
+            return
+        delta = {k: v for k, v in payload.items() if k not in last or last[k] != v}
+        if delta:
+            broadcast(self.delta_event, delta)
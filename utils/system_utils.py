@@ -1,59 +1,174 @@
 """System statistics collection utilities."""
+import glob
+import heapq
+import os
 import socket
 import time
 
+from utils.cache_utils import ttl_cache
+from utils.procfs import ProcFile
 from utils.subprocess_helper import run as subprocess_run
 
 import psutil
 
-from app_state import DISK_MOUNT_POINT, network_stats_lock, network_stats_cache
+import app_state
+from app_state import DISK_MOUNT_POINT
 
-# Cache for uname result
-_uname_cache = None
+# Read directly rather than via psutil.virtual_memory() / boot_time(): one
+# pread() of an already-open file each, no per-call object building
+_meminfo = ProcFile('/proc/meminfo')
+_uptime = ProcFile('/proc/uptime')
+_cpu_thermal = ProcFile('/sys/class/thermal/thermal_zone0/temp', bufsize=64)
+
+
+def _find_thermal_zone(zone_type):
+    """Return a ProcFile for the temp of the thermal zone named zone_type, or None."""
+    for zone in sorted(glob.glob('/sys/class/thermal/thermal_zone*')):
+        try:
+            with open(os.path.join(zone, 'type')) as f:
+                if f.read().strip() == zone_type:
+                    return ProcFile(os.path.join(zone, 'temp'), bufsize=64)
+        except OSError:
+            continue
+    return None
+
+
+# Kernels that expose the VideoCore sensor as its own zone let the GPU
+# temperature be a file read; otherwise fall back to forking vcgencmd
+_gpu_thermal = _find_thermal_zone('gpu-thermal')
+
+# Fixed for the life of the process
+_HOSTNAME = socket.gethostname()
+_KERNEL_RELEASE = os.uname().release  # uname(2), same as `uname -r`
+
+# Bytes -> GiB, as a multiply
+_INV_GB = 1.0 / (1 << 30)
+
+# /proc/<pid>/stat CPU times are in clock ticks
+_CLK_TCK = os.sysconf('SC_CLK_TCK')
+
+# {pid: (cpu_ticks, start_ticks, monotonic time)} from the previous
+# get_top_cpu_processes() sweep, for per-interval CPU usage
+_prev_cpu_times = {}
+
+# An interface's address rarely changes; re-check it this often (seconds)
+_IP_ADDRESS_TTL = 60.0
+
+# cpu_percent(interval=None) reports usage since the previous call, and the
+# first call has nothing to compare against (it returns 0.0). Prime the
+# per-core counters now so the first broadcast is real data.
+psutil.cpu_percent(interval=None, percpu=True)
 
 
 def get_uname() -> str:
     """Get kernel version string."""
-    global _uname_cache
-    if not _uname_cache:
-        _uname_cache = subprocess_run(
-            ['uname', '-r'],
-            capture_output=True,
-            text=True,
-            timeout=2
-        ).stdout.strip()
-    return _uname_cache
+    return _KERNEL_RELEASE
+
+
+def _read_meminfo():
+    """Return /proc/meminfo as {field: bytes} (values there are in kB)."""
+    meminfo = {}
+    for line in _meminfo.read().splitlines():
+        fields = line.split()
+        if len(fields) >= 2:
+            meminfo[fields[0].rstrip(b':')] = int(fields[1]) * 1024
+    return meminfo
+
+
+def _read_uptime():
+    """Return seconds since boot, from /proc/uptime."""
+    return float(_uptime.read().split()[0])
+
+
+@ttl_cache(_IP_ADDRESS_TTL)
+def _get_ipv4_address(interface):
+    """Return the first IPv4 address of `interface`, or 'N/A'.
+
+    psutil.net_if_addrs() enumerates every interface, so it's cached per
+    interface rather than called on every stats tick.
+    """
+    addrs = psutil.net_if_addrs().get(interface, [])
+    return next((addr.address for addr in addrs if addr.family == socket.AF_INET), 'N/A')
+
+
+def _read_vcgencmd_temp():
+    """Return the GPU temperature in F from `vcgencmd measure_temp`, or None."""
+    result = subprocess_run(
+        ['vcgencmd', 'measure_temp'],
+        capture_output=True,
+        text=True,
+        timeout=2
+    )
+    if result.returncode != 0:
+        return None
+    # Parse output like "temp=46.6'C"
+    temp_str = result.stdout.strip().split('=')[1].split("'")[0]
+    gpu_temp_c = float(temp_str)
+    return round((gpu_temp_c * 9/5) + 32, 1)
+
+
+def _list_pids():
+    """Return the pids of all processes, from the /proc directory listing."""
+    return [int(entry) for entry in os.listdir('/proc') if entry.isdigit()]
+
+
+def _read_proc_stat(pid):
+    """Return (name, cpu_ticks, start_ticks) from /proc/<pid>/stat."""
+    with open(f'/proc/{pid}/stat', 'rb') as f:
+        return _parse_proc_stat(f.read())
+
+
+def _parse_proc_stat(data):
+    """Parse the contents of a /proc/<pid>/stat file into (name, cpu_ticks, start_ticks).
+
+    cpu_ticks is utime + stime. The name (comm) is parenthesised and may
+    itself contain spaces or ')', so fields are counted from the last ')'.
+    """
+    rpar = data.rindex(b')')
+    name = data[data.index(b'(') + 1:rpar].decode(errors='replace')
+    fields = data[rpar + 2:].split()  # fields[0] is field 3 (state)
+    return name, int(fields[11]) + int(fields[12]), int(fields[19])
 
 
 def get_top_cpu_processes(n=5):
-    """Get top N processes by CPU usage using ps command (non-blocking).
+    """Get top N processes by CPU usage, read straight from /proc (no ps fork).
 
-    Uses ps which gives a coherent snapshot of CPU usage across all processes.
+    Each process is measured by its CPU time since the previous call - its
+    current usage - and only processes seen on that call are ranked; one
+    that is new (or whose pid was reused) is ranked from the next call on.
+    The very first call has nothing to compare against, so it ranks every
+    process by ps's pcpu figure (CPU time over its lifetime) instead; the two
+    measures are never mixed in one ranking. Like ps, 100% is one full core.
     """
+    global _prev_cpu_times
     try:
-        # ps aux sorted by CPU, get top n+1 (skip header)
-        result = subprocess_run(
-            ['ps', '-eo', 'pid,pcpu,comm', '--sort=-pcpu', '--no-headers'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if result.returncode != 0:
-            return []
-
-        processes = []
-        for line in result.stdout.strip().split('\n')[:n]:
-            if not line.strip():
-                continue
-            parts = line.split(None, 2)  # Split into 3 parts max
-            if len(parts) >= 3:
-                pid, cpu, name = parts
-                processes.append({
-                    'name': name,
-                    'pid': int(pid),
-                    'cpu_percent': round(float(cpu), 1)
-                })
-        return processes
+        now = time.monotonic()
+        first_sweep = not _prev_cpu_times
+        uptime = _read_uptime() if first_sweep else None
+        current = {}
+        usage = []
+        for pid in _list_pids():
+            try:
+                name, ticks, start = _read_proc_stat(pid)
+            except (OSError, ValueError, IndexError):
+                continue  # Exited mid-sweep
+            current[pid] = (ticks, start, now)
+            if first_sweep:
+                elapsed = uptime - start / _CLK_TCK
+                cpu = ticks / _CLK_TCK / elapsed * 100 if elapsed > 0 else 0.0
+            else:
+                prev = _prev_cpu_times.get(pid)
+                if prev is None or prev[1] != start or now <= prev[2]:
+                    continue  # New to us, or the pid was reused: no interval yet
+                cpu = max(ticks - prev[0], 0) / _CLK_TCK / (now - prev[2]) * 100
+            usage.append((cpu, pid, name))
+        # Replaced wholesale, so pids that have exited drop out
+        _prev_cpu_times = current
+
+        return [
+            {'name': name, 'pid': pid, 'cpu_percent': round(cpu, 1)}
+            for cpu, pid, name in heapq.nlargest(n, usage)
+        ]
     except Exception as e:
         print(f"Error getting top CPU processes: {e}")
         return []
@@ -65,53 +180,58 @@ def get_system_stats():
 
     stats['uname'] = get_uname()
 
-    # CPU Usage - overall and per-core (non-blocking)
-    # interval=None returns CPU usage since last call (or since module import on first call)
-    stats['cpu_percent'] = psutil.cpu_percent(interval=None)
-    stats['cpu_per_core'] = psutil.cpu_percent(interval=None, percpu=True)
+    # CPU Usage - per-core (non-blocking), overall as their mean: one read of
+    # /proc/stat instead of two. interval=None returns CPU usage since last
+    # call (primed at module import)
+    per_core = psutil.cpu_percent(interval=None, percpu=True)
+    stats['cpu_percent'] = round(sum(per_core) / len(per_core), 1) if per_core else 0.0
+    stats['cpu_per_core'] = per_core
 
     # CPU Temperature (convert C to F)
     try:
-        with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-            cpu_temp_c = float(f.read().strip()) / 1000.0
-            cpu_temp_f = (cpu_temp_c * 9/5) + 32
-            stats['cpu_temp'] = round(cpu_temp_f, 1)
+        cpu_temp_c = float(_cpu_thermal.read()) / 1000.0
+        cpu_temp_f = (cpu_temp_c * 9/5) + 32
+        stats['cpu_temp'] = round(cpu_temp_f, 1)
     except Exception as e:
         stats['cpu_temp'] = None
         print(f"Error reading CPU temperature: {e}")
 
     # GPU Temperature (convert C to F)
     try:
-        result = subprocess_run(
-            ['vcgencmd', 'measure_temp'],
-            capture_output=True,
-            text=True,
-            timeout=2
-        )
-        if result.returncode == 0:
-            # Parse output like "temp=46.6'C"
-            temp_str = result.stdout.strip().split('=')[1].split("'")[0]
-            gpu_temp_c = float(temp_str)
-            gpu_temp_f = (gpu_temp_c * 9/5) + 32
-            stats['gpu_temp'] = round(gpu_temp_f, 1)
+        if _gpu_thermal is not None:
+            gpu_temp_c = float(_gpu_thermal.read()) / 1000.0
+            stats['gpu_temp'] = round((gpu_temp_c * 9/5) + 32, 1)
         else:
-            stats['gpu_temp'] = None
+            stats['gpu_temp'] = _read_vcgencmd_temp()
     except Exception as e:
         stats['gpu_temp'] = None
         print(f"Error reading GPU temperature: {e}")
 
-    # RAM Usage
-    ram = psutil.virtual_memory()
-    stats['ram_percent'] = ram.percent
-    stats['ram_used_gb'] = round(ram.used / (1024**3), 2)
-    stats['ram_total_gb'] = round(ram.total / (1024**3), 2)
+    # RAM Usage - computed the way psutil.virtual_memory() does: percent from
+    # MemAvailable, "used" excluding free memory, buffers and page cache
+    try:
+        mem = _read_meminfo()
+        total = mem[b'MemTotal']
+        available = mem.get(b'MemAvailable', mem[b'MemFree'])
+        used = total - mem[b'MemFree'] - mem.get(b'Buffers', 0) \
+            - mem.get(b'Cached', 0) - mem.get(b'SReclaimable', 0)
+        if used < 0:
+            used = total - mem[b'MemFree']
+        stats['ram_percent'] = round((total - available) / total * 100, 1)
+        stats['ram_used_gb'] = round(used * _INV_GB, 2)
+        stats['ram_total_gb'] = round(total * _INV_GB, 2)
+    except Exception as e:
+        stats['ram_percent'] = 0
+        stats['ram_used_gb'] = 0
+        stats['ram_total_gb'] = 0
+        print(f"Error reading memory stats: {e}")
 
     # Disk Usage for specified mount point
     try:
         disk = psutil.disk_usage(DISK_MOUNT_POINT)
         stats['disk_percent'] = disk.percent
-        stats['disk_free_gb'] = round(disk.free / (1024**3), 2)
-        stats['disk_total_gb'] = round(disk.total / (1024**3), 2)
+        stats['disk_free_gb'] = round(disk.free * _INV_GB, 2)
+        stats['disk_total_gb'] = round(disk.total * _INV_GB, 2)
         stats['disk_mount'] = DISK_MOUNT_POINT
     except Exception as e:
         stats['disk_percent'] = 0
@@ -120,19 +240,17 @@ def get_system_stats():
         stats['disk_mount'] = DISK_MOUNT_POINT
         print(f"Error reading disk stats: {e}")
 
-    # Network Speed - read from cache (updated by background thread)
-    with network_stats_lock:
-        stats['upload_mbps'] = network_stats_cache['upload_mbps']
-        stats['download_mbps'] = network_stats_cache['download_mbps']
-        stats['network_interface'] = network_stats_cache['network_interface']
+    # Network Speed - read from cache (published by background thread)
+    net = app_state.network_stats_cache
+    stats['upload_mbps'] = net['upload_mbps']
+    stats['download_mbps'] = net['download_mbps']
+    stats['network_interface'] = net['network_interface']
 
     # Get hostname and IP address
     try:
-        stats['hostname'] = socket.gethostname()
+        stats['hostname'] = _HOSTNAME
         # IP of the primary interface, so it matches the speeds reported above
-        addrs = psutil.net_if_addrs().get(stats['network_interface'], [])
-        ipv4_addr = next((addr.address for addr in addrs if addr.family == socket.AF_INET), 'N/A')
-        stats['ip_address'] = ipv4_addr
+        stats['ip_address'] = _get_ipv4_address(stats['network_interface'])
     except Exception as e:
         stats['hostname'] = 'Unknown'
         stats['ip_address'] = 'N/A'
@@ -140,8 +258,7 @@ def get_system_stats():
 
     # Get system uptime
     try:
-        boot_time = psutil.boot_time()
-        uptime_seconds = time.time() - boot_time
+        uptime_seconds = _read_uptime()
         days = int(uptime_seconds // 86400)
         hours = int((uptime_seconds % 86400) // 3600)
         minutes = int((uptime_seconds % 3600) // 60)